@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.common.TimingRecorder import compute_percentile
+
+
+class AdaptiveTimingProfile:
+    """
+        AdaptiveTimingProfile - learns how long each kind of wait really takes, persisted between runs
+        Every wait is keyed by an operation (e.g. navigation, or the appearance of an element by its selector),
+        the latest latencies of each operation are kept to tune its poll interval: a fast operation is polled
+        often, a slow one rarely. The timeouts are left to the caller, a wait returns as soon as its condition holds
+        so a shorter timeout would gain nothing but turn an unusually slow response into a failure.
+        Until an operation has enough samples, the default timing of the caller is used.
+    """
+
+    MAX_SAMPLES_PER_OPERATION: int = 50
+    MAX_OPERATIONS: int = 300
+    MIN_SAMPLES_TO_TUNE: int = 5
+
+    def __init__(self, profile_path: str):
+        self.__profile_path: str = profile_path
+        self.__lock: threading.Lock = threading.Lock()
+        self.__latencies: dict[str, list[float]] = self.__load()
+
+    def observe(self, operation_key: str, latency: float) -> None:
+        with self.__lock:
+            # re-insert to keep the most recently observed operations at the end of the dict
+            samples: list[float] = self.__latencies.pop(operation_key, [])
+            samples.append(round(latency, 3))
+            self.__latencies[operation_key] = samples[-self.MAX_SAMPLES_PER_OPERATION:]
+
+            while len(self.__latencies) > self.MAX_OPERATIONS:
+                del self.__latencies[next(iter(self.__latencies))]
+
+    def tune_poll_interval(self, operation_key: str, default_interval: float, min_interval: float = 0.05) -> float:
+        samples: list[float] = self.__get_sorted_samples(operation_key)
+        if len(samples) < self.MIN_SAMPLES_TO_TUNE:
+            return default_interval
+        return min(default_interval, max(min_interval, compute_percentile(samples, 50) / 5))
+
+    def save(self) -> None:
+        with self.__lock:
+            with open(self.__profile_path, 'w') as profile_file:
+                json.dump(self.__latencies, profile_file)
+
+    def __get_sorted_samples(self, operation_key: str) -> list[float]:
+        with self.__lock:
+            return sorted(self.__latencies.get(operation_key, []))
+
+    def __load(self) -> dict[str, list[float]]:
+        logger: Logger = get_current_logger()
+        if not os.path.exists(self.__profile_path) or os.path.getsize(self.__profile_path) == 0:
+            return {}
+
+        try:
+            with open(self.__profile_path, 'r') as profile_file:
+                return json.load(profile_file)
+        except (json.JSONDecodeError, OSError) as exception:
+            logger.warning('Discard the broken timing profile {}: {}'.format(self.__profile_path, exception))
+            return {}
@@ -0,0 +1,134 @@
+import itertools
+import threading
+from logging import Logger
+
+import psutil
+
+from src.common.CancellationToken import CancellationToken
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class BrowserBudget:
+    """
+        BrowserBudget - the process-wide budget of the browsers the running tasks may open at the same time
+        A task leases a slot before starting a browser and gives it back once the browser is gone.
+        When the maximum number of browsers is reached, or the browsers already running use more memory (RSS of the
+        driver and all its browser processes) than the maximum, the next lease waits instead of thrashing the memory.
+        Without configuration the budget is unlimited.
+    """
+    __instance = None
+
+    __class_lock = threading.Lock()
+
+    @staticmethod
+    def get_instance():
+        if BrowserBudget.__instance is None:
+            BrowserBudget.__instance = BrowserBudget()
+        return BrowserBudget.__instance
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+
+            with cls.__class_lock:
+
+                if cls.__instance is None:
+                    cls.__instance = super(BrowserBudget, cls).__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            with self.__class_lock:
+                if not hasattr(self, '_initialized'):
+                    self.__max_browsers: int | None = None
+                    self.__max_total_rss_mb: float | None = None
+                    # lease id -> the pid of the driver process, None until the browser is started
+                    self.__leases: dict[int, int | None] = {}
+                    self.__lease_ids = itertools.count(1)
+                    self.__condition: threading.Condition = threading.Condition(threading.Lock())
+                    self._initialized = True
+
+    def configure(self, max_browsers: int = None, max_total_rss_mb: float = None) -> None:
+        with self.__condition:
+            self.__max_browsers = max_browsers
+            self.__max_total_rss_mb = max_total_rss_mb
+            self.__condition.notify_all()
+
+    def acquire(self, cancellation_token: CancellationToken = None) -> int:
+        """
+            Block until the budget allows one more browser, return the id of the lease.
+            Only for a caller without a lease, one holding a lease asks for more with try_acquire
+        """
+        logger: Logger = get_current_logger()
+        is_waiting_logged: bool = False
+
+        with self.__condition:
+            while True:
+                if cancellation_token is not None:
+                    cancellation_token.raise_if_cancelled()
+
+                exceeded_reason: str | None = self.__get_exceeded_reason()
+                if exceeded_reason is None:
+                    lease_id: int = next(self.__lease_ids)
+                    self.__leases[lease_id] = None
+                    return lease_id
+
+                if not is_waiting_logged:
+                    logger.info('Wait for a browser slot: {}'.format(exceeded_reason))
+                    is_waiting_logged = True
+                # the memory of the running browsers changes without notification, so check it again periodically
+                self.__condition.wait(timeout=1)
+
+    def try_acquire(self) -> int | None:
+        """
+            Lease a browser slot only if the budget allows one right away, return the id of the lease or None.
+            For a holder of a lease asking for more, waiting for them while keeping its own could never end
+        """
+        with self.__condition:
+            if self.__get_exceeded_reason() is not None:
+                return None
+
+            lease_id: int = next(self.__lease_ids)
+            self.__leases[lease_id] = None
+            return lease_id
+
+    def attach_process(self, lease_id: int, pid: int) -> None:
+        with self.__condition:
+            if lease_id in self.__leases:
+                self.__leases[lease_id] = pid
+
+    def release(self, lease_id: int) -> None:
+        with self.__condition:
+            self.__leases.pop(lease_id, None)
+            self.__condition.notify_all()
+
+    def __get_exceeded_reason(self) -> str | None:
+        if len(self.__leases) == 0:
+            # a single browser is always allowed, whatever its memory
+            return None
+
+        if self.__max_browsers is not None and len(self.__leases) >= self.__max_browsers:
+            return '{} browsers are running, the maximum is {}'.format(len(self.__leases), self.__max_browsers)
+
+        if self.__max_total_rss_mb is not None:
+            total_rss_mb: float = self.__compute_total_rss_mb()
+            if total_rss_mb >= self.__max_total_rss_mb:
+                return 'the running browsers use {:.0f} MB, the maximum is {:.0f} MB'.format(total_rss_mb,
+                                                                                         self.__max_total_rss_mb)
+        return None
+
+    def __compute_total_rss_mb(self) -> float:
+        total_rss: int = 0
+        for pid in self.__leases.values():
+            if pid is None:
+                continue
+
+            try:
+                driver_process: psutil.Process = psutil.Process(pid)
+                for process in [driver_process] + driver_process.children(recursive=True):
+                    total_rss += process.memory_info().rss
+            except psutil.Error:
+                # the browser is exiting, its memory is about to be freed
+                continue
+
+        return total_rss / (1024 * 1024)
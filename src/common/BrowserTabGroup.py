@@ -0,0 +1,158 @@
+import os
+import threading
+from typing import Any, Callable, TypeVar
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+T = TypeVar('T')
+
+
+class BrowserTabGroup:
+    """
+        BrowserTabGroup - shares one browser, and so its logged-in session, between threads each working in a tab
+        of its own, instead of starting a browser per thread.
+        A WebDriver session has a single current window: while other tabs are open, every command of a tab, and of
+        the elements found in it, switches the session to that tab first, under a lock shared by the tabs. A tab only
+        holds the browser for the time of one command, while it sleeps or polls (e.g. a download, an XHR) the other
+        tabs go on.
+        The frames are not followed across the switches, a tab must work in its top-level document.
+        An isolated tab lives in a browser context of its own (CDP Target.createBrowserContext), like an incognito
+        window: it shares neither cookies nor storage with the other tabs and has its own download folder, so
+        several accounts can be logged in within a single browser.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.__driver: WebDriver = driver
+        self.__lock: threading.RLock = threading.RLock()
+        self.__current_window_handle: str = driver.current_window_handle
+        self.__main_tab: BrowserTab = BrowserTab(self, driver, self.__current_window_handle)
+        # the main tab included, a tab alone in the group never needs to switch windows
+        self.__open_tabs: list[BrowserTab] = [self.__main_tab]
+
+    def main_tab(self) -> WebDriver:
+        """ The tab the browser was on when the group was created """
+        return self.__main_tab
+
+    @property
+    def tab_count(self) -> int:
+        with self.__lock:
+            return len(self.__open_tabs)
+
+    def open_tab(self) -> WebDriver:
+        with self.__lock:
+            # opened aside through CDP, the session stays on the current tab until the new one runs a command
+            target_id: str = self.__driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank'})['targetId']
+            # chromedriver names the windows after their targets
+            tab: BrowserTab = BrowserTab(self, self.__driver, target_id)
+            self.__open_tabs.append(tab)
+            return tab
+
+    def open_isolated_tab(self, download_folder: str = None) -> WebDriver:
+        with self.__lock:
+            browser_context_id: str = self.__driver.execute_cdp_cmd('Target.createBrowserContext',
+                                                                    {})['browserContextId']
+            if download_folder is not None:
+                self.__driver.execute_cdp_cmd('Browser.setDownloadBehavior',
+                                              {'behavior': 'allow',
+                                               'downloadPath': os.path.abspath(download_folder),
+                                               'browserContextId': browser_context_id})
+            target_id: str = self.__driver.execute_cdp_cmd('Target.createTarget',
+                                                           {'url': 'about:blank',
+                                                            'browserContextId': browser_context_id})['targetId']
+            # chromedriver names the windows after their targets
+            tab: BrowserTab = BrowserTab(self, self.__driver, target_id, browser_context_id)
+            self.__open_tabs.append(tab)
+            return tab
+
+    def close_tab(self, tab: WebDriver) -> None:
+        with self.__lock:
+            self.run_in_tab(tab, self.__driver.close)
+            # by identity, the tabs compare equal as they wrap the same driver
+            self.__open_tabs = [open_tab for open_tab in self.__open_tabs if open_tab is not tab]
+            # the session needs a window again, the one of a tab left alone must be its own
+            self.__current_window_handle = self.__open_tabs[0].tab_window_handle
+            self.__driver.switch_to.window(self.__current_window_handle)
+            if tab.tab_browser_context_id is not None:
+                # its cookies, storage and cache go with it
+                self.__driver.execute_cdp_cmd('Target.disposeBrowserContext',
+                                              {'browserContextId': tab.tab_browser_context_id})
+
+    def run_in_tab(self, tab: 'BrowserTab', operation: Callable[[], T]) -> T:
+        with self.__lock:
+            # alone in the group, the tab runs in whatever window it went to (e.g. a popup it opened)
+            if len(self.__open_tabs) > 1 and self.__current_window_handle != tab.tab_window_handle:
+                self.__driver.switch_to.window(tab.tab_window_handle)
+                self.__current_window_handle = tab.tab_window_handle
+            return operation()
+
+    def follow_window_switch(self, tab: 'BrowserTab') -> None:
+        """ The tab switched the session to another window itself (e.g. a popup it opened), it goes on there """
+        with self.__lock:
+            self.__current_window_handle = self.__driver.current_window_handle
+            tab.tab_window_handle = self.__current_window_handle
+
+
+class _InTab:
+    """ Runs each access to the wrapped driver, element or other driver object in the window of its tab """
+
+    def __init__(self, tab: 'BrowserTab', target: Any):
+        self._tab: BrowserTab = tab
+        self._target: Any = target
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ('_tab', '_target', 'tab_group', 'tab_window_handle', 'tab_browser_context_id'):
+            # not set yet, e.g. while being copied
+            raise AttributeError(name)
+
+        group: BrowserTabGroup = self._tab.tab_group
+        value: Any = group.run_in_tab(self._tab, lambda: getattr(self._target, name))
+        if not callable(value):
+            return self._in_tab(value)
+
+        def call_in_tab(*args, **kwargs) -> Any:
+            arguments: list = [_InTab._unwrap(argument) for argument in args]
+            keyword_arguments: dict = {key: _InTab._unwrap(argument) for key, argument in kwargs.items()}
+
+            def call() -> Any:
+                result: Any = value(*arguments, **keyword_arguments)
+                if isinstance(self._target, SwitchTo) and name in ('window', 'new_window'):
+                    group.follow_window_switch(self._tab)
+                return result
+
+            return self._in_tab(group.run_in_tab(self._tab, call))
+
+        return call_in_tab
+
+    def __eq__(self, other: Any) -> bool:
+        return self._target == _InTab._unwrap(other)
+
+    def __hash__(self) -> int:
+        return hash(self._target)
+
+    def _in_tab(self, value: Any) -> Any:
+        # the plain values are returned as they are, the driver objects keep running in the tab
+        if value is None or isinstance(value, (str, bytes, int, float, bool, dict)):
+            return value
+        if isinstance(value, list):
+            return [self._in_tab(item) for item in value]
+        return _InTab(self._tab, value)
+
+    @staticmethod
+    def _unwrap(value: Any) -> Any:
+        if isinstance(value, _InTab):
+            return value._target
+        if isinstance(value, (list, tuple)):
+            return type(value)(_InTab._unwrap(item) for item in value)
+        return value
+
+
+class BrowserTab(_InTab):
+    """ BrowserTab - a driver working in one tab of a BrowserTabGroup, used like the WebDriver it wraps """
+
+    def __init__(self, group: BrowserTabGroup, driver: WebDriver, window_handle: str, browser_context_id: str = None):
+        super().__init__(self, driver)
+        self.tab_group: BrowserTabGroup = group
+        self.tab_window_handle: str = window_handle
+        # None for a tab of the default browser context
+        self.tab_browser_context_id: str | None = browser_context_id
@@ -0,0 +1,36 @@
+import threading
+
+
+class OperationCancelledException(Exception):
+    pass
+
+
+class CancellationToken:
+    """
+        CancellationToken - a cooperative cancellation signal shared between a task and its blocking helpers
+        The helpers wait on the token instead of time.sleep, so a cancellation wakes them up immediately
+        rather than after the current sleep or polling loop is over.
+    """
+
+    def __init__(self):
+        self.__cancelled_event: threading.Event = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.__cancelled_event.is_set()
+
+    def cancel(self) -> None:
+        self.__cancelled_event.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """ Block until cancelled or the timeout is over, return True if the token has been cancelled """
+        return self.__cancelled_event.wait(timeout)
+
+    def sleep(self, seconds: float) -> None:
+        """ Sleep for the given seconds, raise OperationCancelledException as soon as the token is cancelled """
+        if self.__cancelled_event.wait(max(0.0, seconds)):
+            raise OperationCancelledException('The operation has been cancelled')
+
+    def raise_if_cancelled(self) -> None:
+        if self.__cancelled_event.is_set():
+            raise OperationCancelledException('The operation has been cancelled')
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class CheckpointJournal:
+    """
+        CheckpointJournal - an append-only JSONL journal remembering which elements of an input have been processed
+        Each line is bound to the fingerprint of the input, so the same task re-run on the same input skips the
+        elements which were recorded as done, while a changed input starts from scratch.
+        The journal is compacted on load and on reset: it is rewritten with the done records still in use only
+        (no duplicates, no broken lines, no records discarded by a reset), so it does not grow run after run.
+    """
+
+    def __init__(self, journal_path: str, fingerprint: str):
+        self.__journal_path: str = journal_path
+        self.__fingerprint: str = fingerprint
+        self.__lock: threading.Lock = threading.Lock()
+        # the done records of every fingerprint by key, the other inputs keep theirs to be resumed too
+        self.__done_records: dict[str, dict[str, dict[str, str]]] = {}
+        self.__load_done_records()
+        self.__done_keys: set[str] = set(self.__done_records.get(fingerprint, {}).keys())
+
+    @staticmethod
+    def compute_fingerprint(input_path: str | None, element_keys: list[str]) -> str:
+        digest = hashlib.sha256()
+        digest.update(str(input_path).encode('utf-8'))
+        for key in element_keys:
+            digest.update(b'\n')
+            digest.update(str(key).encode('utf-8'))
+        return digest.hexdigest()
+
+    @property
+    def done_count(self) -> int:
+        return len(self.__done_keys)
+
+    def is_done(self, key: str) -> bool:
+        return str(key) in self.__done_keys
+
+    def mark_done(self, key: str) -> None:
+        key = str(key)
+        with self.__lock:
+            if key in self.__done_keys:
+                return
+            record: dict[str, str] = {'fingerprint': self.__fingerprint, 'key': key, 'status': 'done',
+                                      'at': datetime.now().isoformat()}
+            self.__append(record)
+            self.__done_records.setdefault(self.__fingerprint, {})[key] = record
+            self.__done_keys.add(key)
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__done_records.pop(self.__fingerprint, None)
+            self.__done_keys.clear()
+            self.__rewrite()
+
+    def __append(self, record: dict[str, str]) -> None:
+        with open(self.__journal_path, 'a') as journal:
+            journal.write(json.dumps(record) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def __rewrite(self) -> None:
+        # write aside then rename, a crash never leaves a half written journal behind
+        temporary_path: str = '{}.tmp'.format(self.__journal_path)
+        with open(temporary_path, 'w') as journal:
+            for records in self.__done_records.values():
+                for record in records.values():
+                    journal.write(json.dumps(record) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary_path, self.__journal_path)
+
+    def __load_done_records(self) -> None:
+        logger: Logger = get_current_logger()
+        if not os.path.exists(self.__journal_path):
+            return
+
+        line_count: int = 0
+        with open(self.__journal_path, 'r') as journal:
+            for line in journal:
+                line = line.strip()
+                if len(line) == 0:
+                    continue
+
+                line_count += 1
+                try:
+                    record: dict[str, str] = json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line may be cut by a crash in the middle of writing
+                    logger.warning('Skip a broken line in checkpoint journal {}'.format(self.__journal_path))
+                    continue
+
+                fingerprint: str | None = record.get('fingerprint')
+                if record.get('status') == 'reset':
+                    # left by the journals which appended a marker instead of compacting
+                    self.__done_records.pop(fingerprint, None)
+                    continue
+
+                if record.get('status') == 'done':
+                    self.__done_records.setdefault(fingerprint, {})[record.get('key')] = record
+
+        if line_count > sum(len(records) for records in self.__done_records.values()):
+            self.__rewrite()
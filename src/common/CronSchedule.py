@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+
+class CronSchedule:
+    """
+        CronSchedule - the fire times of a cron expression 'minute hour day-of-month month day-of-week'
+        Each field accepts *, a value, a range a-b, a step */n or a-b/n, and lists of them separated by commas.
+        The days of week go from 0 (Sunday) to 6, 7 is Sunday as well. Like cron, when both the day of month and
+        the day of week are restricted, a day matching either of them fires.
+    """
+
+    __FIELD_RANGES: list[tuple[int, int]] = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        fields: list[str] = expression.split()
+        if len(fields) != 5:
+            raise Exception('The cron expression "{}" must have 5 fields: minute hour day month weekday'
+                            .format(expression))
+
+        self.expression: str = expression
+        self.__minutes, self.__hours, self.__days, self.__months, weekdays = [
+            self.__parse_field(field, minimum, maximum)
+            for field, (minimum, maximum) in zip(fields, self.__FIELD_RANGES)]
+        self.__weekdays: set[int] = {weekday % 7 for weekday in weekdays}
+        self.__is_day_restricted: bool = fields[2] != '*'
+        self.__is_weekday_restricted: bool = fields[4] != '*'
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        """ The first minute strictly after the given time matching the expression """
+        candidate: datetime = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        deadline: datetime = candidate + timedelta(days=366 * 5)
+
+        while candidate < deadline:
+            if candidate.month not in self.__months or not self.__is_day_matched(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.__hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.__minutes:
+                candidate = candidate + timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise Exception('The cron expression "{}" never fires'.format(self.expression))
+
+    def __is_day_matched(self, candidate: datetime) -> bool:
+        # isoweekday is 1 (Monday) to 7 (Sunday), cron counts from 0 (Sunday)
+        is_day_matched: bool = candidate.day in self.__days
+        is_weekday_matched: bool = candidate.isoweekday() % 7 in self.__weekdays
+
+        if self.__is_day_restricted and self.__is_weekday_restricted:
+            return is_day_matched or is_weekday_matched
+        return is_day_matched and is_weekday_matched
+
+    @staticmethod
+    def __parse_field(field: str, minimum: int, maximum: int) -> set[int]:
+        values: set[int] = set()
+        for part in field.split(','):
+            value_range, _, step = part.partition('/')
+            if value_range == '*':
+                start, end = minimum, maximum
+            elif '-' in value_range:
+                start, end = [int(value) for value in value_range.split('-', 1)]
+            else:
+                start = end = int(value_range)
+                if step != '':
+                    end = maximum
+
+            if start < minimum or end > maximum or start > end:
+                raise Exception('The cron field "{}" is out of the range {}-{}'.format(field, minimum, maximum))
+
+            values.update(range(start, end + 1, int(step) if step != '' else 1))
+        return values
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from logging import Logger
+from typing import Callable
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from src.common.CancellationToken import CancellationToken
+from src.common.ThreadLocalLogger import get_current_logger
+
+CHROME_PARTIAL_DOWNLOAD_EXTENSION: str = '.crdownload'
+
+
+class DownloadWatcher(FileSystemEventHandler):
+    """
+        DownloadWatcher - tells when a file downloaded by the browser into a folder is complete, woken up by the
+        file system events of the folder (inotify, ReadDirectoryChangesW, ...) rather than checking it every second.
+        Chrome writes a download into <name>.crdownload and renames it once over, a file is complete when it exists,
+        has no .crdownload left next to it and kept the same size for STABLE_TIME.
+        When the events can not be watched (e.g. a network folder) the folder is polled every POLL_INTERVAL instead.
+    """
+
+    # in seconds, the waits check the folder this often even without events, e.g. to react to a cancellation
+    POLL_INTERVAL: float = 0.25
+    # in seconds, how long the size of a file must stay the same to be complete
+    STABLE_TIME: float = 0.2
+
+    def __init__(self, folder: str):
+        super().__init__()
+        self.__folder: str = os.path.abspath(folder)
+        self.__observer: Observer | None = None
+        self.__changed_condition: threading.Condition = threading.Condition()
+        # incremented on each event, so a waiter knows whether something happened since its last check
+        self.__change_count: int = 0
+
+    def start(self) -> None:
+        logger: Logger = get_current_logger()
+        if self.__observer is not None:
+            return
+
+        observer: Observer = Observer()
+        try:
+            observer.schedule(self, self.__folder, recursive=False)
+            observer.start()
+            self.__observer = observer
+        except Exception as exception:
+            logger.warning('Can not watch the events of {}, poll it instead: {}'.format(self.__folder, exception))
+
+    def stop(self) -> None:
+        if self.__observer is None:
+            return
+
+        self.__observer.stop()
+        self.__observer.join()
+        self.__observer = None
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        with self.__changed_condition:
+            self.__change_count += 1
+            self.__changed_condition.notify_all()
+
+    def wait_for_file(self, file_path: str, timeout: float, cancellation_token: CancellationToken) -> str:
+        """ Block until the download of the file is complete and return its path, or raise TimeoutError """
+        return self.__wait(lambda: self.__get_complete_file([os.path.abspath(file_path)]),
+                           description=file_path,
+                           timeout=timeout,
+                           cancellation_token=cancellation_token)
+
+    def wait_for_any_file(self, extension: str, timeout: float, cancellation_token: CancellationToken) -> str:
+        """ Block until a download with the extension is complete in the folder and return its path """
+
+        def get_complete_file_with_extension() -> str | None:
+            file_paths: list[str] = [os.path.join(self.__folder, file_name)
+                                     for file_name in sorted(os.listdir(self.__folder))
+                                     if file_name.lower().endswith(extension.lower())]
+            return self.__get_complete_file(file_paths)
+
+        return self.__wait(get_complete_file_with_extension,
+                           description='a {} file in {}'.format(extension, self.__folder),
+                           timeout=timeout,
+                           cancellation_token=cancellation_token)
+
+    def list_file_names(self) -> set[str]:
+        return set(os.listdir(self.__folder))
+
+    def wait_for_new_file(self, previous_file_names: set[str], timeout: float,
+                          cancellation_token: CancellationToken) -> str:
+        """
+            Block until a file which is not in previous_file_names appears in the folder, complete or not (e.g. its
+            .crdownload), and return its path, to know a download has started
+        """
+
+        def get_new_file() -> str | None:
+            for file_name in sorted(os.listdir(self.__folder)):
+                if file_name not in previous_file_names:
+                    return os.path.join(self.__folder, file_name)
+            return None
+
+        return self.__wait(get_new_file,
+                           description='a new file in {}'.format(self.__folder),
+                           timeout=timeout,
+                           cancellation_token=cancellation_token)
+
+    def __wait(self,
+               get_complete_file: Callable[[], str | None],
+               description: str,
+               timeout: float,
+               cancellation_token: CancellationToken) -> str:
+        start_time: float = time.monotonic()
+        while True:
+            with self.__changed_condition:
+                checked_change_count: int = self.__change_count
+
+            complete_file_path: str | None = get_complete_file()
+            if complete_file_path is not None:
+                return complete_file_path
+
+            elapsed: float = time.monotonic() - start_time
+            if elapsed >= timeout:
+                raise TimeoutError('Timeout after {:.2f}s waiting for the download of {}'.format(elapsed, description))
+            cancellation_token.raise_if_cancelled()
+
+            with self.__changed_condition:
+                if self.__change_count == checked_change_count:
+                    self.__changed_condition.wait(min(self.POLL_INTERVAL, timeout - elapsed))
+
+    def __get_complete_file(self, file_paths: list[str]) -> str | None:
+        for file_path in file_paths:
+            if os.path.exists(file_path + CHROME_PARTIAL_DOWNLOAD_EXTENSION):
+                continue
+
+            first_size: int = self.__get_size(file_path)
+            if first_size <= 0:
+                continue
+
+            # a file copied or written by something else than Chrome has no .crdownload, it must stop growing
+            time.sleep(self.STABLE_TIME)
+            if self.__get_size(file_path) == first_size:
+                return file_path
+        return None
+
+    @staticmethod
+    def __get_size(file_path: str) -> int:
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return -1
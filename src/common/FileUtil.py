@@ -57,52 +57,61 @@ def load_key_value_from_file_properties(setting_file: str) -> dict[str, str]:
         return settings
 
 
+def parse_excel_cell_position(cell_position: str) -> tuple[str, int]:
+    """ Split a cell position like B5 into its column B and its row 5 """
+    result = re.search(r'([a-zA-Z]+)(\d+)', cell_position)
+    if not result:
+        raise Exception("Not match excel cell position format")
+    return result.group(1), int(result.group(2))
+
+
 def get_excel_data_in_column_start_at_row(file_path, sheet_name, start_cell) -> list[str]:
+    return get_excel_data_in_columns_start_at_row(file_path, sheet_name, [start_cell])[0]
+
+
+def get_excel_data_in_columns_start_at_row(file_path, sheet_name, start_cells: list[str]) -> list[list[str]]:
+    """ Like get_excel_data_in_column_start_at_row for many columns, loading the workbook only once """
     logger: Logger = get_current_logger()
-    column: str = 'A'
-    start_row: int = 0
-
-    result = re.search(r'([a-zA-Z]+)(\d+)', start_cell)
-    if result:
-        column = result.group(1)
-        start_row = int(result.group(2))
-    else:
-        raise Exception("Not match excel cell position format")
+    cell_positions: list[tuple[str, int]] = [parse_excel_cell_position(start_cell) for start_cell in start_cells]
 
     file_path = r'{}'.format(file_path)
-    logger.info(
-        r"Read data from file {} at sheet {}, collect all data at column {} start from row {}".format(
-            file_path, sheet_name, column, start_row))
+    for column, start_row in cell_positions:
+        logger.info(
+            r"Read data from file {} at sheet {}, collect all data at column {} start from row {}".format(
+                file_path, sheet_name, column, start_row))
 
     with ResourceLock(file_path=file_path):
 
         workbook: Workbook = openpyxl.load_workbook(filename=r'{}'.format(file_path), data_only=True, keep_vba=True)
         worksheet: Worksheet = workbook[sheet_name]
 
-        values: list[str] = []
-        runner: int = 0
-        max_index = start_row - 1
-        for cell in worksheet[column]:
-            cell: Cell = cell
+        columns_values: list[list[str]] = []
+        for column, start_row in cell_positions:
+            values: list[str] = []
+            runner: int = 0
+            max_index = start_row - 1
+            for cell in worksheet[column]:
+                cell: Cell = cell
 
-            if runner < max_index:
-                runner += 1
-                continue
+                if runner < max_index:
+                    runner += 1
+                    continue
 
-            if cell.value is None:
-                continue
+                if cell.value is None:
+                    continue
 
-            values.append(str(cell.value))
-            runner += 1
+                values.append(str(cell.value))
+                runner += 1
 
-        if len(values) == 0:
-            logger.error(
-                r'Not containing any data from file {} at sheet {} at column {} start from row {}'.format(
-                    file_path, sheet_name, column, start_row))
-            raise Exception("Not containing required data in the specified place in file Excel")
+            if len(values) == 0:
+                logger.error(
+                    r'Not containing any data from file {} at sheet {} at column {} start from row {}'.format(
+                        file_path, sheet_name, column, start_row))
+                raise Exception("Not containing required data in the specified place in file Excel")
+            columns_values.append(values)
 
         logger.info('Collect data from excel file successfully')
-        return values
+        return columns_values
 
 
 def extract_zip(zip_file_path: str,
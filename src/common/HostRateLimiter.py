@@ -0,0 +1,115 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+from src.common.CancellationToken import CancellationToken
+
+
+class TokenBucket:
+    """
+        TokenBucket - lets through up to `rate` requests per second on average, with bursts of up to `burst` requests
+        The bucket refills continuously, a request takes one token or waits until one is available.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError('The rate of a token bucket must be positive')
+        self.rate: float = rate
+        self.burst: int = max(1, burst)
+        self.__tokens: float = self.burst
+        self.__last_refill_time: float = time.monotonic()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """ Take a token if there is one and return 0, otherwise return the seconds until the next token """
+        with self.__lock:
+            now: float = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__last_refill_time) * self.rate)
+            self.__last_refill_time = now
+
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return 0
+            return (1 - self.__tokens) / self.rate
+
+    def acquire(self, cancellation_token: CancellationToken = None) -> float:
+        """ Block until a token is taken, return the seconds spent waiting """
+        if cancellation_token is None:
+            cancellation_token = CancellationToken()
+
+        waited_time: float = 0
+        while True:
+            waiting_time: float = self.try_acquire()
+            if waiting_time == 0:
+                return waited_time
+            cancellation_token.sleep(waiting_time)
+            waited_time += waiting_time
+
+
+class HostRateLimiter:
+    """
+        HostRateLimiter - one token bucket per host, shared by all the tasks running in the process
+        so the concurrent tasks hitting the same site are paced together instead of each one on its own.
+        A host without a configured rate is not limited.
+    """
+    __instance = None
+
+    __class_lock = threading.Lock()
+
+    @staticmethod
+    def get_instance():
+        if HostRateLimiter.__instance is None:
+            HostRateLimiter.__instance = HostRateLimiter()
+        return HostRateLimiter.__instance
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+
+            with cls.__class_lock:
+
+                if cls.__instance is None:
+                    cls.__instance = super(HostRateLimiter, cls).__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            with self.__class_lock:
+                if not hasattr(self, '_initialized'):
+                    self.__host_to_bucket: dict[str, TokenBucket] = {}
+                    self.__instance_lock = threading.Lock()
+                    self._initialized = True
+
+    def configure(self, host: str, rate: float, burst: int = 1) -> None:
+        """ Set the rate of a host, a host configured by many tasks keeps the strictest rate """
+        host = host.lower()
+        with self.__instance_lock:
+            bucket: TokenBucket = self.__host_to_bucket.get(host)
+            if bucket is None or rate < bucket.rate:
+                self.__host_to_bucket[host] = TokenBucket(rate=rate, burst=burst)
+
+    def configure_from_settings(self, settings: dict[str, str]) -> None:
+        """ Read the keys rate.limit.<host> = <requests per second>[, <burst>] e.g rate.limit.example.com = 2, 5 """
+        prefix: str = 'rate.limit.'
+        for key, value in settings.items():
+            if not key.startswith(prefix):
+                continue
+
+            parts: list[str] = [part.strip() for part in value.split(',')]
+            burst: int = int(parts[1]) if len(parts) > 1 and parts[1] != '' else 1
+            self.configure(host=key[len(prefix):], rate=float(parts[0]), burst=burst)
+
+    @property
+    def has_limits(self) -> bool:
+        with self.__instance_lock:
+            return len(self.__host_to_bucket) > 0
+
+    def acquire(self, url: str, cancellation_token: CancellationToken = None) -> float:
+        """ Wait for the turn of the host of the given url, return the seconds spent waiting """
+        host: str = (urlparse(url).hostname or '').lower()
+        with self.__instance_lock:
+            bucket: TokenBucket = self.__host_to_bucket.get(host)
+
+        if bucket is None:
+            return 0
+        return bucket.acquire(cancellation_token)
@@ -0,0 +1,98 @@
+import concurrent.futures
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import Logger
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.common.CancellationToken import CancellationToken
+from src.common.HostRateLimiter import HostRateLimiter
+from src.common.ThreadLocalLogger import get_current_logger, bind_current_logger
+
+PARTIAL_DOWNLOAD_EXTENSION: str = '.part'
+
+
+class HttpDocumentFetcher:
+    """
+        HttpDocumentFetcher - downloads documents whose URL is known over HTTP, with the cookies of a logged-in
+        browser, instead of clicking them and waiting for the browser to save them.
+        At most max_concurrent documents are fetched at the same time over a single keep-alive session, each of them
+        is written aside into <name>.part and renamed to its target name once complete, so a half written document
+        is never seen under its final name. The requests go through the process-wide HostRateLimiter.
+    """
+
+    CHUNK_SIZE: int = 64 * 1024
+
+    def __init__(self, max_concurrent: int, cancellation_token: CancellationToken, timeout: float = 60):
+        self.__cancellation_token: CancellationToken = cancellation_token
+        self.__timeout: float = timeout
+        self.__session: requests.Session = requests.Session()
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=max_concurrent, pool_maxsize=max_concurrent)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_concurrent,
+                                                                 thread_name_prefix='HttpDocumentFetcher')
+
+    def update_session(self, cookies: list[dict], user_agent: str = None, auth: tuple[str, str] = None) -> None:
+        """ Take over the session of the browser, the cookies are given as returned by WebDriver.get_cookies """
+        for cookie in cookies:
+            self.__session.cookies.set(cookie['name'], cookie['value'],
+                                       domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        if user_agent is not None:
+            self.__session.headers['User-Agent'] = user_agent
+        if auth is not None:
+            self.__session.auth = auth
+
+    def submit(self, url: str, file_path: str) -> Future:
+        """ Start fetching the document in the background, the future gives its path once it is written """
+        return self.__executor.submit(self.__fetch, url, file_path, get_current_logger())
+
+    def wait(self, future: Future, timeout: float) -> str:
+        """ Block until the fetch is over and return the path of the document, or raise TimeoutError """
+        start_time: float = time.monotonic()
+        while True:
+            # in slices, to react to a cancellation while the document is still being fetched
+            elapsed: float = time.monotonic() - start_time
+            done, _ = concurrent.futures.wait([future], timeout=max(0.0, min(0.25, timeout - elapsed)))
+            if len(done) > 0:
+                return future.result()
+
+            if time.monotonic() - start_time >= timeout:
+                raise TimeoutError('Timeout after {:.2f}s waiting for the fetch of a document'
+                                   .format(time.monotonic() - start_time))
+            self.__cancellation_token.raise_if_cancelled()
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+        self.__session.close()
+
+    def __fetch(self, url: str, file_path: str, logger: Logger) -> str:
+        bind_current_logger(logger)
+        rate_limiter: HostRateLimiter = HostRateLimiter.get_instance()
+        if rate_limiter.has_limits:
+            rate_limiter.acquire(url, self.__cancellation_token)
+
+        partial_file_path: str = file_path + PARTIAL_DOWNLOAD_EXTENSION
+        try:
+            with self.__session.get(url, stream=True, timeout=self.__timeout) as response:
+                response.raise_for_status()
+                # an expired session is redirected to the login page rather than refused
+                if 'text/html' in response.headers.get('Content-Type', ''):
+                    raise Exception('Fetching {} gives a web page instead of the document, the session may have '
+                                    'expired'.format(url))
+
+                with open(partial_file_path, 'wb') as partial_file:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        self.__cancellation_token.raise_if_cancelled()
+                        partial_file.write(chunk)
+
+            os.replace(partial_file_path, file_path)
+        except BaseException:
+            if os.path.exists(partial_file_path):
+                os.remove(partial_file_path)
+            raise
+
+        logger.info('Fetched {} into {}'.format(url, file_path))
+        return file_path
@@ -17,13 +17,21 @@ class Percentage(ABC):
 
     @current_element_count.setter
     def current_element_count(self, new_value):
+        self.__set_current_element_count(new_value, is_skipping=False)
+
+    def skip_to_element_count(self, new_value: int) -> None:
+        """ Move the progress at once past the elements which are not processed, e.g. the ones a resumed run skips """
+        self.__set_current_element_count(new_value, is_skipping=True)
+
+    def __set_current_element_count(self, new_value: int, is_skipping: bool) -> None:
         if new_value <= self.__current_element_count:
             return
 
         self.__current_element_count = new_value
         EventBroker.get_instance().publish(topic=PercentChangedEvent.event_name,
                                            event=PercentChangedEvent(task_name=type(self).__name__,
-                                                                     current_percent=self._get_current_percentage()))
+                                                                     current_percent=self._get_current_percentage(),
+                                                                     is_skipping=is_skipping))
 
     @property
     def __class__(self):
@@ -0,0 +1,115 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from logging import Logger
+from logging.handlers import QueueHandler
+from multiprocessing.synchronize import Event as ProcessEvent
+
+from src.common.ThreadLocalLogger import bind_current_logger, get_current_logger
+from src.observer.Event import Event
+from src.observer.EventBroker import EventBroker
+from src.observer.EventHandler import EventHandler
+from src.observer.PercentChangedEvent import PercentChangedEvent
+
+PROGRESS_MESSAGE: str = 'progress'
+DONE_MESSAGE: str = 'done'
+
+
+class ProgressRelayingHandler(EventHandler):
+    """ Forward the progress of the task running in the child process to the parent through the relay queue """
+
+    def __init__(self, task, relay_queue: multiprocessing.Queue):
+        self.__task = task
+        self.__relay_queue: multiprocessing.Queue = relay_queue
+
+    def handle_incoming_event(self, event: Event) -> None:
+        if isinstance(event, PercentChangedEvent):
+            self.__relay_queue.put((PROGRESS_MESSAGE, self.__task.current_element_count,
+                                    self.__task.total_element_size, event.is_skipping))
+
+
+def create_relaying_logger(class_name: str, relay_queue: multiprocessing.Queue) -> Logger:
+    """ The logger of a task in a child process, its records are handled by the task logger of the parent """
+    created_logger: Logger = logging.getLogger(class_name)
+    created_logger.addHandler(QueueHandler(relay_queue))
+    created_logger.setLevel(logging.INFO)
+    return bind_current_logger(created_logger)
+
+
+def perform_task_in_child_process(settings: dict[str, str],
+                                  relay_queue: multiprocessing.Queue,
+                                  terminate_event: ProcessEvent,
+                                  pause_event: ProcessEvent) -> None:
+    """
+        The entry point of the child process: create the same task from its settings, mirror the terminate and
+        pause requests of the parent onto it, then perform it with its logs and progress relayed to the parent
+    """
+    # imported here as ReflectionUtil depends on AutomatedTask, which starts the child processes
+    from src.common.ReflectionUtil import create_task_instance
+
+    task = create_task_instance(settings, settings['invoked_class'], None)
+    task.relay_queue = relay_queue
+    EventBroker.get_instance().subscribe(topic=PercentChangedEvent.event_name,
+                                         observer=ProgressRelayingHandler(task, relay_queue))
+
+    def mirror_parent_controls() -> None:
+        while not terminate_event.wait(0.1):
+            if pause_event.is_set() and not task.paused:
+                task.pause()
+            elif not pause_event.is_set() and task.paused:
+                task.resume()
+        task.terminate()
+
+    threading.Thread(target=mirror_parent_controls, daemon=True).start()
+    task.perform()
+    relay_queue.put((DONE_MESSAGE, task.succeeded))
+
+
+def relay_child_process(process: multiprocessing.Process,
+                        relay_queue: multiprocessing.Queue,
+                        terminate_event: ProcessEvent,
+                        pause_event: ProcessEvent,
+                        task) -> bool:
+    """
+        Run on the parent task thread until the child process exits: hand the log records over to the task logger,
+        apply the relayed progress on the task (so the GUI progress bar keeps working) and pass its terminate and
+        pause requests down. Return whether the task succeeded in the child process
+    """
+    logger: Logger = get_current_logger()
+    succeeded: bool = False
+    is_process_exited: bool = False
+
+    while True:
+        if task.terminated:
+            terminate_event.set()
+        if task.paused:
+            pause_event.set()
+        else:
+            pause_event.clear()
+
+        try:
+            message = relay_queue.get(timeout=0.1)
+        except queue.Empty:
+            # one more round after the exit to drain what the child flushed right before it
+            if is_process_exited:
+                break
+            is_process_exited = not process.is_alive()
+            continue
+
+        if isinstance(message, logging.LogRecord):
+            logger.handle(message)
+        elif message[0] == PROGRESS_MESSAGE:
+            _, current_element_count, total_element_size, is_skipping = message
+            task.total_element_size = total_element_size
+            if is_skipping:
+                task.skip_to_element_count(current_element_count)
+            else:
+                task.current_element_count = current_element_count
+        elif message[0] == DONE_MESSAGE:
+            succeeded = message[1]
+
+    process.join()
+    if process.exitcode != 0:
+        logger.error('The process of the task exited with code {}'.format(process.exitcode))
+    return succeeded
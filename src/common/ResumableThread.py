@@ -1,6 +1,8 @@
 import threading
 from abc import abstractmethod
 
+from src.common.CancellationToken import CancellationToken
+
 
 class ResumableThread(threading.Thread):
     def __init__(self, target=None, group=None, name=None,
@@ -14,6 +16,7 @@ class ResumableThread(threading.Thread):
         self.paused = False
         self.terminated = False
         self.pause_condition = threading.Condition(threading.Lock())
+        self.cancellation_token = CancellationToken()
 
     @abstractmethod
     def perform(self):
@@ -28,10 +31,11 @@ class ResumableThread(threading.Thread):
     def resume(self):
         with self.pause_condition:
             self.paused = False
-            self.pause_condition.notify()
+            self.pause_condition.notify_all()
 
     def terminate(self):
         self.terminated = True
+        self.cancellation_token.cancel()
         with self.pause_condition:
             self.paused = False
-            self.pause_condition.notify()
+            self.pause_condition.notify_all()
@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+from logging import Logger
+from typing import Callable, TypeVar
+
+from src.common.CancellationToken import OperationCancelledException
+from src.common.ThreadLocalLogger import get_current_logger
+
+T = TypeVar('T')
+
+
+class RetryExhaustedException(Exception):
+    pass
+
+
+class RetryPolicy:
+    """
+        RetryPolicy - a shared retry mechanism replacing the hand-written attempt counters with fixed sleeps
+        The delay between attempts grows exponentially from initial_delay up to max_delay, each delay is shrunk
+        randomly by at most the jitter ratio so concurrent tasks do not retry against a portal at the same moment.
+        Only the retryable exceptions are retried, the others are raised immediately, and so is a cancellation
+        whatever the retryable exceptions are.
+        Retrying stops after max_attempts or when the next attempt would start after max_elapsed seconds.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 5,
+                 initial_delay: float = 0.5,
+                 max_delay: float = 8.0,
+                 multiplier: float = 2.0,
+                 jitter: float = 0.5,
+                 max_elapsed: float = None,
+                 retryable_exceptions: tuple[type[BaseException], ...] = (Exception,),
+                 sleep: Callable[[float], None] = time.sleep):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+
+        if not 0 <= jitter <= 1:
+            raise ValueError('jitter must be in range [0, 1]')
+
+        self.max_attempts: int = max_attempts
+        self.initial_delay: float = initial_delay
+        self.max_delay: float = max_delay
+        self.multiplier: float = multiplier
+        self.jitter: float = jitter
+        self.max_elapsed: float = max_elapsed
+        self.retryable_exceptions: tuple[type[BaseException], ...] = retryable_exceptions
+        self.__sleep: Callable[[float], None] = sleep
+
+        self.__metrics_lock: threading.Lock = threading.Lock()
+        self.total_attempts: int = 0
+        self.total_failures: int = 0
+        self.total_delay: float = 0
+
+    def compute_delay(self, attempt: int) -> float:
+        delay: float = min(self.max_delay, self.initial_delay * pow(self.multiplier, attempt - 1))
+        return delay - random.uniform(0, delay * self.jitter)
+
+    def execute(self,
+                operation: Callable[[], T],
+                on_retry: Callable[[int, Exception], None] = None,
+                description: str = None) -> T:
+        """
+            Run the operation until it succeeds, on_retry(attempt, exception) is invoked after each failed attempt
+            which will be retried, letting the caller recover the state (e.g. reload the page) before the next one
+        """
+        logger: Logger = get_current_logger()
+        description = getattr(operation, '__name__', 'operation') if description is None else description
+        start_time: float = time.monotonic()
+        attempt: int = 0
+
+        while True:
+            attempt += 1
+            attempt_start_time: float = time.monotonic()
+            try:
+                result: T = operation()
+                self.__record_attempt(failed=False)
+                if attempt > 1:
+                    logger.info('{} succeeded at attempt {} after {:.2f}s'
+                                .format(description, attempt, time.monotonic() - start_time))
+                return result
+
+            except OperationCancelledException:
+                raise
+
+            except self.retryable_exceptions as exception:
+                attempt_duration: float = time.monotonic() - attempt_start_time
+                delay: float = self.compute_delay(attempt)
+                elapsed: float = time.monotonic() - start_time
+                self.__record_attempt(failed=True)
+
+                logger.debug('{} failed at attempt {}/{} in {:.2f}s: {}'
+                             .format(description, attempt, self.max_attempts, attempt_duration, exception))
+
+                if attempt >= self.max_attempts:
+                    raise RetryExhaustedException('{} still fails after {} attempts'
+                                                  .format(description, attempt)) from exception
+
+                if self.max_elapsed is not None and elapsed + delay > self.max_elapsed:
+                    raise RetryExhaustedException('{} still fails after {:.2f}s'
+                                                  .format(description, elapsed)) from exception
+
+                if on_retry is not None:
+                    on_retry(attempt, exception)
+
+                with self.__metrics_lock:
+                    self.total_delay += delay
+                self.__sleep(delay)
+
+    def __record_attempt(self, failed: bool) -> None:
+        with self.__metrics_lock:
+            self.total_attempts += 1
+            if failed:
+                self.total_failures += 1
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from logging import Logger
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class SessionStore:
+    """
+        SessionStore - keeps the authenticated state of a browser (cookies, local storage) per site and user on disk,
+        encrypted with a key generated on the first use, so a run can restore the session of the previous one
+        instead of logging in again.
+        The key is kept apart from the sessions, in the home folder of the user (~/.automation_tool/session.key),
+        so copying the output folder does not take the key along. The key file is only readable by its owner: its
+        mode is 0600 on POSIX, on Windows it gets the permissions of the user profile, only open to its owner.
+        A state which can not be decrypted (e.g. the key has been replaced) is discarded as if it was never saved.
+    """
+
+    KEY_FILE_NAME: str = 'session.key'
+
+    def __init__(self, store_dir: str, key_path: str = None):
+        self.__store_dir: str = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        if key_path is None:
+            key_path = os.path.join(os.path.expanduser('~'), '.automation_tool', self.KEY_FILE_NAME)
+        self.__key_path: str = key_path
+        self.__lock: threading.Lock = threading.Lock()
+        self.__fernet: Fernet = Fernet(self.__load_or_create_key())
+
+    def load(self, site: str, user: str) -> dict | None:
+        logger: Logger = get_current_logger()
+        state_path: str = self.__get_state_path(site, user)
+        with self.__lock:
+            if not os.path.exists(state_path):
+                return None
+
+            try:
+                with open(state_path, 'rb') as state_file:
+                    return json.loads(self.__fernet.decrypt(state_file.read()))
+            except (InvalidToken, ValueError, OSError) as exception:
+                logger.warning('Discard the unreadable session of {} on {}: {}'.format(user, site, exception))
+                os.remove(state_path)
+                return None
+
+    def save(self, site: str, user: str, state: dict) -> None:
+        state_path: str = self.__get_state_path(site, user)
+        encrypted_state: bytes = self.__fernet.encrypt(json.dumps(dict(state, saved_at=datetime.now().isoformat()))
+                                                       .encode('utf-8'))
+        with self.__lock:
+            # write aside then rename, a crash never leaves a half written session behind
+            temporary_path: str = '{}.tmp'.format(state_path)
+            with open(temporary_path, 'wb') as state_file:
+                state_file.write(encrypted_state)
+            os.replace(temporary_path, state_path)
+
+    def discard(self, site: str, user: str) -> None:
+        state_path: str = self.__get_state_path(site, user)
+        with self.__lock:
+            if os.path.exists(state_path):
+                os.remove(state_path)
+
+    def __get_state_path(self, site: str, user: str) -> str:
+        # hashed so neither the site nor the user name appears on disk
+        digest: str = hashlib.sha256('{}|{}'.format(site, user).encode('utf-8')).hexdigest()
+        return os.path.join(self.__store_dir, '{}.session'.format(digest))
+
+    def __load_or_create_key(self) -> bytes:
+        key_path: str = self.__key_path
+        with self.__lock:
+            if os.path.exists(key_path):
+                if os.name == 'posix' and os.stat(key_path).st_mode & 0o077 != 0:
+                    get_current_logger().warning('Restrict the session key {} to its owner'.format(key_path))
+                    os.chmod(key_path, 0o600)
+                with open(key_path, 'rb') as key_file:
+                    return key_file.read()
+
+            key: bytes = Fernet.generate_key()
+            # the modes are ignored on Windows
+            os.makedirs(os.path.dirname(os.path.abspath(key_path)), mode=0o700, exist_ok=True)
+            key_file_descriptor: int = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(key_file_descriptor, 'wb') as key_file:
+                key_file.write(key)
+            return key
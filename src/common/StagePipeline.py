@@ -0,0 +1,176 @@
+import queue
+import threading
+import time
+from logging import Logger
+from typing import Callable, Any
+
+from src.common.CancellationToken import CancellationToken, OperationCancelledException
+from src.common.ThreadLocalLogger import get_current_logger, bind_current_logger
+
+_END_OF_STREAM = object()
+
+
+class PipelineStage:
+
+    def __init__(self, name: str, operation: Callable[[Any], Any]):
+        self.name: str = name
+        self.operation: Callable[[Any], Any] = operation
+
+
+class StageStatistics:
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.processed_count: int = 0
+        self.failed_count: int = 0
+        self.total_latency: float = 0
+        self.max_latency: float = 0
+        self.queue_depth: int = 0
+        self.max_queue_depth: int = 0
+
+    @property
+    def average_latency(self) -> float:
+        handled_count: int = self.processed_count + self.failed_count
+        return 0 if handled_count == 0 else self.total_latency / handled_count
+
+    def __str__(self) -> str:
+        return ('Stage {}: processed {}, failed {}, latency avg {:.2f}s max {:.2f}s, queue depth now {} max {}'
+                .format(self.name, self.processed_count, self.failed_count, self.average_latency,
+                        self.max_latency, self.queue_depth, self.max_queue_depth))
+
+
+class StagePipeline:
+    """
+        StagePipeline - chains the stages of a per-element work through bounded queues
+        The first stage runs on the thread submitting the elements (e.g. the one driving the browser),
+        each next stage runs on its own thread and receives what the previous stage returned.
+        A full queue blocks the previous stage, so a slow stage holds back the producer instead of piling up work.
+        A failure of the first stage is raised to the submitter, failures of the later stages are logged and
+        only drop the failed element.
+    """
+
+    def __init__(self, stages: list[PipelineStage], queue_size: int = 4,
+                 cancellation_token: CancellationToken = None,
+                 on_element_completed: Callable[[Any], None] = None):
+        if len(stages) == 0:
+            raise ValueError('A pipeline needs at least one stage')
+
+        self.__stages: list[PipelineStage] = stages
+        # the queue at index i feeds the stage at index i + 1, each item pairs the submitted element with the
+        # result of the previous stage
+        self.__queues: list[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in stages[1:]]
+        self.__cancellation_token: CancellationToken = CancellationToken() \
+            if cancellation_token is None else cancellation_token
+        self.__statistics: list[StageStatistics] = [StageStatistics(stage.name) for stage in stages]
+        self.__statistics_lock: threading.Lock = threading.Lock()
+        self.__threads: list[threading.Thread] = []
+        self.__on_element_completed: Callable[[Any], None] = on_element_completed
+
+    def start(self) -> None:
+        logger: Logger = get_current_logger()
+        for stage_index in range(1, len(self.__stages)):
+            thread: threading.Thread = threading.Thread(target=self.__consume,
+                                                        args=(stage_index, logger),
+                                                        daemon=False)
+            thread.start()
+            self.__threads.append(thread)
+
+    def submit(self, element: Any) -> None:
+        result: Any = self.__run_stage(0, element)
+        if len(self.__queues) == 0:
+            self.__complete(element)
+            return
+
+        self.__put(0, (element, result))
+
+    def close(self) -> None:
+        """ Wait for all submitted elements to go through the remaining stages """
+        if len(self.__queues) > 0 and not self.__cancellation_token.is_cancelled:
+            try:
+                self.__put(0, _END_OF_STREAM)
+            except OperationCancelledException:
+                pass
+
+        for thread in self.__threads:
+            thread.join()
+
+    def get_statistics(self) -> list[StageStatistics]:
+        with self.__statistics_lock:
+            for stage_index in range(1, len(self.__stages)):
+                self.__statistics[stage_index].queue_depth = self.__queues[stage_index - 1].qsize()
+            return list(self.__statistics)
+
+    def __consume(self, stage_index: int, logger: Logger) -> None:
+        bind_current_logger(logger)
+        try:
+            self.__consume_until_end_of_stream(stage_index, logger)
+        except OperationCancelledException:
+            logger.info('Stage {} has been terminated'.format(self.__stages[stage_index].name))
+
+    def __consume_until_end_of_stream(self, stage_index: int, logger: Logger) -> None:
+        input_queue: queue.Queue = self.__queues[stage_index - 1]
+        is_last_stage: bool = stage_index == len(self.__stages) - 1
+
+        while True:
+            try:
+                item: Any = input_queue.get(timeout=0.1)
+            except queue.Empty:
+                self.__cancellation_token.raise_if_cancelled()
+                continue
+
+            if item is _END_OF_STREAM:
+                if not is_last_stage:
+                    self.__put(stage_index, _END_OF_STREAM)
+                return
+
+            element, previous_result = item
+            try:
+                result: Any = self.__run_stage(stage_index, previous_result)
+            except OperationCancelledException:
+                raise
+            except Exception as exception:
+                logger.exception('Stage {} failed on {}: {}'
+                                 .format(self.__stages[stage_index].name, element, exception))
+                continue
+
+            if is_last_stage:
+                self.__complete(element)
+                continue
+
+            self.__put(stage_index, (element, result))
+
+    def __complete(self, element: Any) -> None:
+        if self.__on_element_completed is not None:
+            self.__on_element_completed(element)
+
+    def __run_stage(self, stage_index: int, element: Any) -> Any:
+        start_time: float = time.monotonic()
+        failed: bool = True
+        try:
+            result: Any = self.__stages[stage_index].operation(element)
+            failed = False
+            return result
+        finally:
+            latency: float = time.monotonic() - start_time
+            with self.__statistics_lock:
+                statistics: StageStatistics = self.__statistics[stage_index]
+                if failed:
+                    statistics.failed_count += 1
+                else:
+                    statistics.processed_count += 1
+                statistics.total_latency += latency
+                statistics.max_latency = max(statistics.max_latency, latency)
+
+    def __put(self, queue_index: int, element: Any) -> None:
+        output_queue: queue.Queue = self.__queues[queue_index]
+        while True:
+            self.__cancellation_token.raise_if_cancelled()
+            try:
+                output_queue.put(element, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+        with self.__statistics_lock:
+            statistics: StageStatistics = self.__statistics[queue_index + 1]
+            statistics.max_queue_depth = max(statistics.max_queue_depth, output_queue.qsize())
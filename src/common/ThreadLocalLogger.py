@@ -32,6 +32,12 @@ def get_current_logger() -> Logger:
     return thread_local_logger.logger
 
 
+def bind_current_logger(logger: Logger) -> Logger:
+    # share an already created logger with a helper thread working on behalf of the same task
+    thread_local_logger.logger = logger
+    return thread_local_logger.logger
+
+
 def create_logger(class_name: str, thread_uuid: str, logging_console_level: int = logging.INFO) -> Logger:
     class_name: str = os.path.splitext(os.path.basename(class_name))[0]
     created_logger: Logger = logging.getLogger(class_name)
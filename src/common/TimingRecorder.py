@@ -0,0 +1,106 @@
+import csv
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator
+
+ELEMENT_STEP_NAME: str = 'element'
+
+
+def compute_percentile(sorted_values: list[float], percent: float) -> float:
+    # nearest-rank percentile on an ascending list
+    if len(sorted_values) == 0:
+        return 0
+    rank: int = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class TimingRecorder:
+    """
+        TimingRecorder - collects the wall-clock spans of a run, grouped by step name
+        The per-element spans are recorded under the step 'element', the spans of the helpers are inclusive,
+        e.g. the span of a click also contains the sleep before it.
+    """
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__durations: dict[str, list[float]] = {}
+        self.__started_at: datetime = datetime.now()
+        self.__start_time: float = time.monotonic()
+
+    def record(self, step_name: str, duration: float) -> None:
+        with self.__lock:
+            self.__durations.setdefault(step_name, []).append(duration)
+
+    @contextmanager
+    def span(self, step_name: str) -> Iterator[None]:
+        start_time: float = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(step_name, time.monotonic() - start_time)
+
+    def summarize(self) -> dict:
+        elapsed: float = time.monotonic() - self.__start_time
+        with self.__lock:
+            durations: dict[str, list[float]] = {step: sorted(values) for step, values in self.__durations.items()}
+
+        steps: list[dict] = []
+        for step_name, values in sorted(durations.items()):
+            steps.append({
+                'step': step_name,
+                'count': len(values),
+                'total': round(sum(values), 3),
+                'p50': round(compute_percentile(values, 50), 3),
+                'p95': round(compute_percentile(values, 95), 3),
+                'max': round(values[-1], 3)
+            })
+
+        element_count: int = len(durations.get(ELEMENT_STEP_NAME, []))
+        return {
+            'started_at': self.__started_at.isoformat(),
+            'elapsed_seconds': round(elapsed, 3),
+            'element_count': element_count,
+            'elements_per_minute': round(element_count * 60 / elapsed, 3) if elapsed > 0 else 0,
+            'steps': steps
+        }
+
+    def export(self, report_dir: str, report_name: str) -> tuple[str, str]:
+        """ Write the summary as <report_name>.json and the per-step rows as <report_name>.csv """
+        summary: dict = self.summarize()
+
+        json_path: str = os.path.join(report_dir, '{}.json'.format(report_name))
+        with open(json_path, 'w') as json_file:
+            json.dump(summary, json_file, indent=2)
+
+        csv_path: str = os.path.join(report_dir, '{}.csv'.format(report_name))
+        with open(csv_path, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=['step', 'count', 'total', 'p50', 'p95', 'max'])
+            writer.writeheader()
+            writer.writerows(summary['steps'])
+
+        return json_path, csv_path
+
+
+def timed_step(step_name: str) -> Callable:
+    """ Record each call of the decorated task method as a span of the task's TimingRecorder """
+
+    def decorator(func: Callable) -> Callable:
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            timing_recorder: TimingRecorder = getattr(self, '_timing_recorder', None)
+            if timing_recorder is None:
+                return func(self, *args, **kwargs)
+
+            with timing_recorder.span(step_name):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,163 @@
+import atexit
+import os
+import threading
+from logging import Logger
+from typing import Callable
+from urllib.parse import urlparse
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class WebDriverPool:
+    """
+        WebDriverPool - keeps the browsers given back by the tasks to lend them to the next ones,
+        instead of starting and quitting a Chrome for each run.
+        The browsers are grouped by the options they were started with (e.g. headless or not),
+        a browser is emptied when given back (tabs, cookies, storage) and gets the download folder of the borrowing
+        task through CDP. A browser is quit once it has been lent max_uses times, or when it can not be emptied.
+        The idle browsers are outside the BrowserBudget, which only counts the lent ones: on top of
+        browser.max_concurrent, up to MAX_IDLE_DRIVERS_PER_OPTIONS browsers per options may be kept running.
+    """
+    __instance = None
+
+    __class_lock = threading.Lock()
+
+    MAX_IDLE_DRIVERS_PER_OPTIONS: int = 2
+
+    @staticmethod
+    def get_instance():
+        if WebDriverPool.__instance is None:
+            WebDriverPool.__instance = WebDriverPool()
+        return WebDriverPool.__instance
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+
+            with cls.__class_lock:
+
+                if cls.__instance is None:
+                    cls.__instance = super(WebDriverPool, cls).__new__(cls)
+
+        return cls.__instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            with self.__class_lock:
+                if not hasattr(self, '_initialized'):
+                    self.__idle_drivers: dict[str, list[WebDriver]] = {}
+                    # id of a started driver -> how many times it has been lent
+                    self.__use_counts: dict[int, int] = {}
+                    self.__instance_lock = threading.Lock()
+                    # the idle browsers must not outlive the program
+                    atexit.register(self.quit_all)
+                    self._initialized = True
+
+    def lease(self, options_key: str, create_driver: Callable[[], WebDriver], download_folder: str = None
+              ) -> WebDriver:
+        """ Lend an idle browser started with the same options, or a new one created by create_driver """
+        logger: Logger = get_current_logger()
+        driver: WebDriver | None = None
+        while driver is None:
+            with self.__instance_lock:
+                idle_drivers: list[WebDriver] = self.__idle_drivers.get(options_key, [])
+                if len(idle_drivers) == 0:
+                    break
+                driver = idle_drivers.pop()
+
+            # a browser may have crashed or been closed while idle
+            if not self.__is_alive(driver):
+                logger.info('Drop a browser of the pool which is not responding')
+                self.__quit(driver)
+                driver = None
+
+        if driver is None:
+            driver = create_driver()
+        else:
+            logger.info('Reuse a browser of the pool')
+
+        with self.__instance_lock:
+            self.__use_counts[id(driver)] = self.__use_counts.get(id(driver), 0) + 1
+
+        if download_folder is not None:
+            driver.execute_cdp_cmd('Browser.setDownloadBehavior', {'behavior': 'allow',
+                                                                   'downloadPath': os.path.abspath(download_folder)})
+        return driver
+
+    def give_back(self, options_key: str, driver: WebDriver, max_uses: int, is_reusable: bool = True) -> None:
+        """ Empty the browser and keep it for the next lease, or quit it if it can not or should not be reused """
+        logger: Logger = get_current_logger()
+        with self.__instance_lock:
+            use_count: int = self.__use_counts.get(id(driver), 0)
+            is_pool_full: bool = len(self.__idle_drivers.get(options_key, [])) >= self.MAX_IDLE_DRIVERS_PER_OPTIONS
+
+        if is_reusable and use_count < max_uses and not is_pool_full and self.__empty(driver):
+            with self.__instance_lock:
+                self.__idle_drivers.setdefault(options_key, []).append(driver)
+            return
+
+        if is_reusable and use_count >= max_uses:
+            logger.info('Recycle a browser of the pool after {} uses'.format(use_count))
+        self.__quit(driver)
+
+    def quit_all(self) -> None:
+        with self.__instance_lock:
+            idle_drivers: list[WebDriver] = [driver for drivers in self.__idle_drivers.values() for driver in drivers]
+            self.__idle_drivers.clear()
+
+        for driver in idle_drivers:
+            self.__quit(driver)
+
+    def __quit(self, driver: WebDriver) -> None:
+        with self.__instance_lock:
+            self.__use_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as exception:
+            get_current_logger().debug('The browser has been closed already: {}'.format(exception))
+
+    @staticmethod
+    def __is_alive(driver: WebDriver) -> bool:
+        try:
+            return driver.current_window_handle is not None
+        except Exception:
+            return False
+
+    @staticmethod
+    def __empty(driver: WebDriver) -> bool:
+        """ Bring the browser back to a single blank tab without any cookie nor storage """
+        try:
+            # the storage can only be cleared per origin: the ones the tabs went through and the ones with cookies
+            visited_origins: set[str] = set()
+            window_handles: list[str] = driver.window_handles
+            for window_handle in window_handles:
+                driver.switch_to.window(window_handle)
+                for history_entry in driver.execute_cdp_cmd('Page.getNavigationHistory', {})['entries']:
+                    visited_origins.update(WebDriverPool.__get_origins(history_entry['url']))
+                if window_handle != window_handles[0]:
+                    driver.close()
+            driver.switch_to.window(window_handles[0])
+            driver.get('about:blank')
+
+            for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']:
+                cookie_host: str = cookie['domain'].lstrip('.')
+                visited_origins.update(['https://' + cookie_host, 'http://' + cookie_host])
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in visited_origins:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            return True
+        except Exception as exception:
+            get_current_logger().warning('Can not empty the browser, it will be quit: {}'.format(exception))
+            return False
+
+    @staticmethod
+    def __get_origins(url: str) -> list[str]:
+        parsed_url = urlparse(url)
+        if parsed_url.scheme not in ('http', 'https') or parsed_url.hostname is None:
+            return []
+        # without the credentials of a URL logging in to the site
+        origin: str = '{}://{}'.format(parsed_url.scheme, parsed_url.hostname)
+        if parsed_url.port is not None:
+            origin += ':{}'.format(parsed_url.port)
+        return [origin]
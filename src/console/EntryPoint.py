@@ -1,16 +1,41 @@
+import multiprocessing
 import os
+import sys
 import threading
 from logging import Logger
 from threading import Thread
 
+from src.common.BrowserBudget import BrowserBudget
+from src.common.CronSchedule import CronSchedule
 from src.common.FileUtil import load_key_value_from_file_properties
 from src.common.ReflectionUtil import create_task_instance
 from src.common.StringUtil import validate_keys_of_dictionary
 from src.common.ThreadLocalLogger import get_current_logger
+from src.console.ThreadPoolTaskRunner import ThreadPoolTaskRunner
+from src.console.RecurringScheduler import RecurringScheduler
+from src.console.TaskDependencyGraph import parse_task_dependencies, sort_tasks_topologically
+from src.console.WatchFolderDaemon import WatchFolderDaemon
 from src.setup.packaging.path.PathResolvingService import PathResolvingService
 from src.task.AutomatedTask import AutomatedTask
 
+
+def create_invoked_task(input_dir: str,
+                        invoked_class: str,
+                        overridden_settings: dict[str, str] = None) -> AutomatedTask:
+    setting_file: str = os.path.join(input_dir, '{}.properties'.format(invoked_class))
+    if not os.path.exists(setting_file):
+        raise Exception("The settings file {} is not existed. Please providing it !".format(setting_file))
+
+    task_settings: dict[str, str] = load_key_value_from_file_properties(setting_file)
+    task_settings['invoked_class'] = invoked_class
+    if overridden_settings is not None:
+        task_settings.update(overridden_settings)
+    return create_task_instance(task_settings, invoked_class, None)
+
+
 if __name__ == "__main__":
+    # lets a frozen executable start the child processes of the process isolated tasks
+    multiprocessing.freeze_support()
     input_dir: str = PathResolvingService.get_instance().get_input_dir()
     setting_file: str = os.path.join(input_dir, 'InvokedClasses.properties')
     if not os.path.exists(setting_file):
@@ -20,23 +45,82 @@ if __name__ == "__main__":
     validate_keys_of_dictionary(settings, {'invoked_classes', 'run.sequentially'})
     defined_classes: list[str] = [class_name.strip() for class_name in settings['invoked_classes'].split(',')]
     run_sequentially: bool = 'True'.lower() == str(settings['run.sequentially']).lower()
+    # run.mode = pool runs the concurrent tasks in a thread pool, at most run.max_concurrency at a time
+    run_in_pool: bool = 'pool' == str(settings.get('run.mode', 'thread')).strip().lower()
+    max_concurrency: int = int(settings.get('run.max_concurrency', 4))
+    # the concurrent web tasks queue for a browser once browser.max_concurrent browsers are running or they use
+    # more than browser.max_total_rss_mb of memory
+    max_browsers: int | None = None if settings.get('browser.max_concurrent') is None \
+        else int(settings['browser.max_concurrent'])
+    max_total_rss_mb: float | None = None if settings.get('browser.max_total_rss_mb') is None \
+        else float(settings['browser.max_total_rss_mb'])
+    BrowserBudget.get_instance().configure(max_browsers=max_browsers, max_total_rss_mb=max_total_rss_mb)
+    # <task>.after = <other tasks> makes a task wait for the ones it depends on, the independent ones run in parallel
+    dependencies: dict[str, set[str]] = parse_task_dependencies(settings, defined_classes)
+    has_dependencies: bool = any(len(upstream_tasks) > 0 for upstream_tasks in dependencies.values())
+    defined_classes = sort_tasks_topologically(defined_classes, dependencies)
+
+    # run.mode = watch keeps running and performs a task for each workbook dropped in its <task>.watch.folder
+    if 'watch' == str(settings.get('run.mode', 'thread')).strip().lower():
+        task_to_folder: dict[str, str] = {invoked_class: settings['{}.watch.folder'.format(invoked_class)].strip()
+                                          for invoked_class in defined_classes
+                                          if settings.get('{}.watch.folder'.format(invoked_class))}
+        if len(task_to_folder) == 0:
+            raise Exception('The watch mode needs at least one <task>.watch.folder in {}'.format(setting_file))
+
+        daemon: WatchFolderDaemon = WatchFolderDaemon(
+            task_to_folder=task_to_folder,
+            create_task=lambda invoked_class: create_invoked_task(input_dir, invoked_class,
+                                                                  {'browser.keep_warm': 'True'}),
+            poll_interval=float(settings.get('watch.poll_interval', 2)))
+        try:
+            daemon.run()
+        except KeyboardInterrupt:
+            get_current_logger().info('Stop watching, waiting for the running tasks to finish')
+        sys.exit(0)
+
+    # run.mode = schedule keeps running and performs each task at the times of its cron expression <task>.schedule
+    if 'schedule' == str(settings.get('run.mode', 'thread')).strip().lower():
+        task_to_schedule: dict[str, CronSchedule] = {
+            invoked_class: CronSchedule(settings['{}.schedule'.format(invoked_class)])
+            for invoked_class in defined_classes
+            if settings.get('{}.schedule'.format(invoked_class))}
+        if len(task_to_schedule) == 0:
+            raise Exception('The schedule mode needs at least one <task>.schedule in {}'.format(setting_file))
+
+        scheduler: RecurringScheduler = RecurringScheduler(
+            task_to_schedule=task_to_schedule,
+            create_task=lambda invoked_class: create_invoked_task(input_dir, invoked_class,
+                                                                  {'browser.keep_warm': 'True'}))
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            get_current_logger().info('Stop scheduling, waiting for the running tasks to finish')
+        sys.exit(0)
 
     running_threads: list[Thread] = []
+    scheduled_tasks: dict[str, AutomatedTask] = {}
+    succeeded_classes: set[str] = set()
     for invoked_class in defined_classes:
 
         logger: Logger = get_current_logger()
         logger.info('Invoking class {}'.format(invoked_class))
 
-        setting_file = os.path.join(input_dir, '{}.properties'.format(invoked_class))
-        if not os.path.exists(setting_file):
-            raise Exception("The settings file {} is not existed. Please providing it !".format(setting_file))
-        
-        settings: dict[str, str] = load_key_value_from_file_properties(setting_file)
-        settings['invoked_class'] = invoked_class
-        automated_task: AutomatedTask = create_task_instance(settings, invoked_class, None)
+        automated_task: AutomatedTask = create_invoked_task(input_dir, invoked_class)
 
         if run_sequentially:
+            if not dependencies[invoked_class].issubset(succeeded_classes):
+                logger.warning('Skip class {} as one of the classes it depends on did not succeed'
+                               .format(invoked_class))
+                continue
+
             automated_task.perform()
+            if automated_task.succeeded:
+                succeeded_classes.add(invoked_class)
+            continue
+
+        if run_in_pool or has_dependencies:
+            scheduled_tasks[invoked_class] = automated_task
             continue
 
         # run concurrently
@@ -45,5 +129,8 @@ if __name__ == "__main__":
         running_task_thread.start()
         running_threads.append(running_task_thread)
 
+    if len(scheduled_tasks) > 0:
+        ThreadPoolTaskRunner(max_concurrency=max_concurrency).run(scheduled_tasks, dependencies)
+
     for thread in running_threads:
         thread.join(timeout=60 * 60)
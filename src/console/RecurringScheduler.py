@@ -0,0 +1,61 @@
+from datetime import datetime
+from logging import Logger
+from typing import Callable
+
+from src.common.CancellationToken import CancellationToken
+from src.common.CronSchedule import CronSchedule
+from src.common.ThreadLocalLogger import get_current_logger
+from src.console.WarmTaskWorker import WarmTaskWorker
+from src.task.AutomatedTask import AutomatedTask
+
+
+class RecurringScheduler:
+    """
+        RecurringScheduler - keeps running and performs each task at the times of its cron expression
+        A task keeps the same instance for all its runs, so its warm browser and logged-in session are reused
+        by the next run. A fire time coming while the previous run of the task is not over yet is skipped
+        rather than piling the runs up.
+    """
+
+    def __init__(self,
+                 task_to_schedule: dict[str, CronSchedule],
+                 create_task: Callable[[str], AutomatedTask],
+                 cancellation_token: CancellationToken = None):
+        self.__task_to_schedule: dict[str, CronSchedule] = task_to_schedule
+        self.__create_task: Callable[[str], AutomatedTask] = create_task
+        self.__cancellation_token: CancellationToken = CancellationToken() \
+            if cancellation_token is None else cancellation_token
+
+    def stop(self) -> None:
+        self.__cancellation_token.cancel()
+
+    def run(self) -> None:
+        logger: Logger = get_current_logger()
+        workers: dict[str, WarmTaskWorker] = {}
+        next_fire_times: dict[str, datetime] = {}
+        for task_name, schedule in self.__task_to_schedule.items():
+            workers[task_name] = WarmTaskWorker(task_name=task_name, create_task=self.__create_task)
+            workers[task_name].start()
+            next_fire_times[task_name] = schedule.next_fire_time(datetime.now())
+            logger.info('Schedule {} at "{}", next run at {}'.format(task_name, schedule.expression,
+                                                                    next_fire_times[task_name]))
+
+        try:
+            while True:
+                task_name: str = min(next_fire_times, key=next_fire_times.get)
+                waiting_seconds: float = (next_fire_times[task_name] - datetime.now()).total_seconds()
+                if self.__cancellation_token.wait(max(0.0, waiting_seconds)):
+                    return
+
+                if workers[task_name].is_busy:
+                    logger.warning('Skip the run of {} at {} as its previous run is not over'
+                                   .format(task_name, next_fire_times[task_name]))
+                else:
+                    logger.info('Run {} scheduled at {}'.format(task_name, next_fire_times[task_name]))
+                    workers[task_name].submit()
+
+                next_fire_times[task_name] = self.__task_to_schedule[task_name].next_fire_time(
+                    next_fire_times[task_name])
+        finally:
+            for worker in workers.values():
+                worker.stop()
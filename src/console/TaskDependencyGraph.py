@@ -0,0 +1,60 @@
+from src.common.Stack import Stack
+
+DEPENDENCY_KEY_SUFFIX: str = '.after'
+
+
+def parse_task_dependencies(settings: dict[str, str], task_names: list[str]) -> dict[str, set[str]]:
+    """
+        Collect the declared dependencies e.g. 'Upload.after = Download_CottonOn, Duty' means Upload only starts
+        when both Download_CottonOn and Duty have finished successfully
+    """
+    dependencies: dict[str, set[str]] = {task_name: set() for task_name in task_names}
+
+    for key, value in settings.items():
+        if not key.endswith(DEPENDENCY_KEY_SUFFIX):
+            continue
+
+        task_name: str = key[:-len(DEPENDENCY_KEY_SUFFIX)].strip()
+        if task_name not in dependencies:
+            raise Exception('{} declares dependencies but it is not in invoked_classes'.format(task_name))
+
+        for upstream_task_name in value.split(','):
+            upstream_task_name = upstream_task_name.strip()
+            if len(upstream_task_name) == 0:
+                continue
+
+            if upstream_task_name not in dependencies:
+                raise Exception('{} depends on {} which is not in invoked_classes'
+                                .format(task_name, upstream_task_name))
+
+            dependencies[task_name].add(upstream_task_name)
+
+    return dependencies
+
+
+def sort_tasks_topologically(task_names: list[str], dependencies: dict[str, set[str]]) -> list[str]:
+    """ Order the tasks so that each one comes after all its dependencies, keeping the declared order otherwise """
+    sorted_task_names: list[str] = []
+    visited: set[str] = set()
+    visiting: Stack[str] = Stack[str]()
+
+    def visit(task_name: str) -> None:
+        if task_name in visited:
+            return
+
+        if task_name in visiting:
+            cycle: list[str] = visiting[visiting.index(task_name):] + [task_name]
+            raise Exception('The task dependencies contain a cycle: {}'.format(' -> '.join(cycle)))
+
+        visiting.append(task_name)
+        for upstream_task_name in sorted(dependencies.get(task_name, set()), key=task_names.index):
+            visit(upstream_task_name)
+        visiting.pop()
+
+        visited.add(task_name)
+        sorted_task_names.append(task_name)
+
+    for name in task_names:
+        visit(name)
+
+    return sorted_task_names
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.console.TaskDependencyGraph import sort_tasks_topologically
+from src.task.AutomatedTask import AutomatedTask
+
+
+class ThreadPoolTaskRunner:
+    """
+        ThreadPoolTaskRunner - runs the tasks on a bounded thread pool instead of starting one OS thread per task.
+        The task bodies stay synchronous (Selenium, pywinauto, file IO): each whole perform() holds a thread of the
+        pool, so at most max_concurrency tasks run at a time and the others are queued in the order they were
+        declared.
+        A task with dependencies is only submitted once all of them succeeded, so it never holds a thread of the
+        pool while waiting for them, and it is skipped if one of them did not.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self.__max_concurrency: int = max_concurrency
+
+    def run(self, tasks: dict[str, AutomatedTask], dependencies: dict[str, set[str]] = None) -> None:
+        if dependencies is None:
+            dependencies = {}
+        logger: Logger = get_current_logger()
+        pending_task_names: list[str] = sort_tasks_topologically(list(tasks.keys()), dependencies)
+        succeeded_task_names: set[str] = set()
+        finished_task_names: set[str] = set()
+
+        with ThreadPoolExecutor(max_workers=self.__max_concurrency,
+                                thread_name_prefix='ThreadPoolTaskRunner') as executor:
+            running_tasks: dict[Future, str] = {}
+            while len(pending_task_names) > 0 or len(running_tasks) > 0:
+                for task_name in list(pending_task_names):
+                    upstream_task_names: set[str] = dependencies.get(task_name, set())
+                    if not upstream_task_names.issubset(finished_task_names):
+                        continue
+
+                    pending_task_names.remove(task_name)
+                    if not upstream_task_names.issubset(succeeded_task_names):
+                        logger.warning('Skip task {} as one of the tasks it depends on did not succeed'
+                                       .format(task_name))
+                        # its own dependants are skipped in turn
+                        finished_task_names.add(task_name)
+                        continue
+
+                    logger.info('Schedule task {}'.format(task_name))
+                    running_tasks[executor.submit(tasks[task_name].perform)] = task_name
+
+                if len(running_tasks) == 0:
+                    # the skipped tasks may have released others
+                    continue
+
+                finished_tasks, _ = wait(running_tasks.keys(), return_when=FIRST_COMPLETED)
+                for finished_task in finished_tasks:
+                    task_name: str = running_tasks.pop(finished_task)
+                    finished_task_names.add(task_name)
+                    if finished_task.exception() is None and tasks[task_name].succeeded:
+                        succeeded_task_names.add(task_name)
+                    logger.info('Task {} finished'.format(task_name))
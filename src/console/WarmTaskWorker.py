@@ -0,0 +1,75 @@
+import queue
+import threading
+from logging import Logger
+from typing import Callable
+
+from src.common.ThreadLocalLogger import get_current_logger, bind_current_logger
+from src.task.AutomatedTask import AutomatedTask
+
+_STOP = object()
+
+
+class WarmTaskWorker:
+    """
+        WarmTaskWorker - performs the runs submitted for one task one after another on its own thread,
+        always with the same task instance, so what the task keeps between its runs (e.g. a warm browser with a
+        logged-in session) is reused instead of being started again for each run
+    """
+
+    def __init__(self, task_name: str, create_task: Callable[[str], AutomatedTask],
+                 on_run_completed: Callable[[dict[str, str]], None] = None):
+        self.__task_name: str = task_name
+        self.__create_task: Callable[[str], AutomatedTask] = create_task
+        self.__on_run_completed: Callable[[dict[str, str]], None] = on_run_completed
+        self.__run_queue: queue.Queue = queue.Queue()
+        self.__is_busy: bool = False
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def is_busy(self) -> bool:
+        """ Whether a run is in progress or waiting to be performed """
+        return self.__is_busy or not self.__run_queue.empty()
+
+    def start(self) -> None:
+        self.__thread = threading.Thread(target=self.__perform_submitted_runs,
+                                         args=(get_current_logger(),),
+                                         daemon=False)
+        self.__thread.start()
+
+    def submit(self, overridden_settings: dict[str, str] = None) -> None:
+        """ Queue a run of the task with the given settings overridden, e.g. the excel.path of a new workbook """
+        self.__run_queue.put({} if overridden_settings is None else overridden_settings)
+
+    def stop(self) -> None:
+        """ Let the queued runs finish, then free the resources of the task """
+        self.__run_queue.put(_STOP)
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def __perform_submitted_runs(self, logger: Logger) -> None:
+        bind_current_logger(logger)
+        task: AutomatedTask | None = None
+        try:
+            while True:
+                overridden_settings = self.__run_queue.get()
+                if overridden_settings is _STOP:
+                    return
+
+                self.__is_busy = True
+                try:
+                    if task is None:
+                        task = self.__create_task(self.__task_name)
+                    task.settings.update(overridden_settings)
+                    task.perform()
+                    bind_current_logger(logger)
+                    if self.__on_run_completed is not None:
+                        self.__on_run_completed(overridden_settings)
+                except Exception as exception:
+                    # a failed run (e.g. a missing mandatory setting) must not stop serving the next ones
+                    bind_current_logger(logger)
+                    logger.exception('A run of {} has failed: {}'.format(self.__task_name, exception))
+                finally:
+                    self.__is_busy = False
+        finally:
+            if task is not None:
+                task.release_resources()
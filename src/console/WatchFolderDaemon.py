@@ -0,0 +1,108 @@
+import os
+import threading
+from logging import Logger
+from typing import Callable
+
+from src.common.CancellationToken import CancellationToken
+from src.common.ThreadLocalLogger import get_current_logger
+from src.console.WarmTaskWorker import WarmTaskWorker
+from src.task.AutomatedTask import AutomatedTask
+
+WORKBOOK_EXTENSIONS: tuple[str, ...] = ('.xlsx', '.xlsm', '.xls')
+
+
+class WatchFolderDaemon:
+    """
+        WatchFolderDaemon - keeps running and performs a task each time a workbook is dropped or changed
+        in the folder watched for it, with the path of that workbook as the excel.path of the task.
+        The folders are polled: a workbook is dispatched once its size and modification time stayed the same for
+        one poll interval, so a file still being copied is not picked up half written.
+        Each task has a single instance performing its workbooks one after another, so its browser stays warm
+        between the runs, the different tasks run concurrently.
+    """
+
+    def __init__(self,
+                 task_to_folder: dict[str, str],
+                 create_task: Callable[[str], AutomatedTask],
+                 poll_interval: float = 2.0,
+                 cancellation_token: CancellationToken = None):
+        self.__task_to_folder: dict[str, str] = task_to_folder
+        self.__create_task: Callable[[str], AutomatedTask] = create_task
+        self.__poll_interval: float = poll_interval
+        self.__cancellation_token: CancellationToken = CancellationToken() \
+            if cancellation_token is None else cancellation_token
+        # path of a workbook -> (size, modification time) when it was last dispatched or seen at start
+        self.__seen_signatures: dict[str, tuple[int, float]] = {}
+        # path of a changed workbook -> its signature at the previous poll, waiting for it to be stable
+        self.__pending_signatures: dict[str, tuple[int, float]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.__workers: dict[str, WarmTaskWorker] = {}
+
+    def stop(self) -> None:
+        self.__cancellation_token.cancel()
+
+    def run(self) -> None:
+        logger: Logger = get_current_logger()
+        for task_name, folder in self.__task_to_folder.items():
+            os.makedirs(folder, exist_ok=True)
+            for path, signature in self.__scan(folder).items():
+                self.__seen_signatures[path] = signature
+            logger.info('Watch {} for the workbooks of {}'.format(folder, task_name))
+
+            worker: WarmTaskWorker = WarmTaskWorker(task_name=task_name,
+                                                    create_task=self.__create_task,
+                                                    on_run_completed=self.__mark_workbook_seen)
+            worker.start()
+            self.__workers[task_name] = worker
+
+        try:
+            while not self.__cancellation_token.wait(self.__poll_interval):
+                for task_name, folder in self.__task_to_folder.items():
+                    for path in self.__poll(folder):
+                        logger.info('Dispatch {} to {}'.format(path, task_name))
+                        self.__workers[task_name].submit({'excel.path': path})
+        finally:
+            for worker in self.__workers.values():
+                worker.stop()
+
+    def __poll(self, folder: str) -> list[str]:
+        """ Return the new or changed workbooks of the folder which stayed the same since the previous poll """
+        stable_paths: list[str] = []
+        with self.__lock:
+            for path, signature in self.__scan(folder).items():
+                if self.__seen_signatures.get(path) == signature:
+                    self.__pending_signatures.pop(path, None)
+                    continue
+
+                if self.__pending_signatures.get(path) != signature:
+                    self.__pending_signatures[path] = signature
+                    continue
+
+                del self.__pending_signatures[path]
+                self.__seen_signatures[path] = signature
+                stable_paths.append(path)
+
+        return stable_paths
+
+    def __mark_workbook_seen(self, overridden_settings: dict[str, str]) -> None:
+        # a task may write its results into the workbook, which is not a change to perform again
+        with self.__lock:
+            self.__seen_signatures.update(self.__scan_file(overridden_settings['excel.path']))
+
+    @staticmethod
+    def __scan(folder: str) -> dict[str, tuple[int, float]]:
+        signatures: dict[str, tuple[int, float]] = {}
+        for file_name in os.listdir(folder):
+            # skip the lock files Excel creates next to an opened workbook
+            if file_name.startswith('~$') or not file_name.lower().endswith(WORKBOOK_EXTENSIONS):
+                continue
+            signatures.update(WatchFolderDaemon.__scan_file(os.path.join(folder, file_name)))
+        return signatures
+
+    @staticmethod
+    def __scan_file(path: str) -> dict[str, tuple[int, float]]:
+        try:
+            file_stat: os.stat_result = os.stat(path)
+        except OSError:
+            return {}
+        return {os.path.abspath(path): (file_stat.st_size, file_stat.st_mtime)}
@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import tkinter as tk
 from logging import Logger
@@ -96,7 +97,7 @@ class GUIApp(tk.Tk, EventHandler, UITaskPerformingStates):
             distance_between_ui_percent_n_event_percent: float = (
                     event.current_percent - float(self.progress_bar['value']))
             default_distance_of_task: float = self.automated_task.get_percentage_distance()
-            if distance_between_ui_percent_n_event_percent > default_distance_of_task:
+            if not event.is_skipping and distance_between_ui_percent_n_event_percent > default_distance_of_task:
                 return
 
             self.progress_bar['value'] = round(event.current_percent)
@@ -282,6 +283,8 @@ class GUIApp(tk.Tk, EventHandler, UITaskPerformingStates):
 
 
 if __name__ == "__main__":
+    # lets a frozen executable start the child processes of the process isolated tasks
+    multiprocessing.freeze_support()
     # from src.setup.packaging.admin.AdminPrivilegeProvider import AdminPrivilegeProvider
     # AdminPrivilegeProvider.validate_and_provide()
     app = GUIApp()
@@ -1,5 +1,8 @@
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from src.common.ThreadLocalLogger import get_current_logger
+from src.observer.Event import Event
 from src.observer.EventHandler import EventHandler
 
 
@@ -30,6 +33,10 @@ class EventBroker:
                 if not hasattr(self, '_initialized'):
                     self.__topicToSetOfObserver: dict[str, set[EventHandler]] = {}
                     self.__instance_lock = threading.Lock()
+                    # one dispatching thread for all events instead of a new thread per event,
+                    # it also keeps the events of a topic in the order they were published
+                    self.__dispatcher: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1,
+                                                                               thread_name_prefix='EventBroker')
                     self._initialized = True
 
     def subscribe(self, topic: str, observer: EventHandler) -> None:
@@ -38,11 +45,15 @@ class EventBroker:
                 self.__topicToSetOfObserver[topic] = set()
             self.__topicToSetOfObserver.get(topic).add(observer)
 
-    def publish(self, topic: str, event: threading.Event) -> None:
+    def publish(self, topic: str, event: Event) -> None:
         observers: set[EventHandler] = self.__topicToSetOfObserver.get(topic, set())
         observer: EventHandler
         for observer in observers:
-            thread: threading.Thread = threading.Thread(target=observer.handle_incoming_event,
-                                                        args=[event],
-                                                        daemon=False)
-            thread.start()
+            self.__dispatcher.submit(self.__dispatch, observer, event)
+
+    @staticmethod
+    def __dispatch(observer: EventHandler, event: Event) -> None:
+        try:
+            observer.handle_incoming_event(event)
+        except Exception as exception:
+            get_current_logger().exception(str(exception))
@@ -4,7 +4,9 @@ from src.observer.Event import Event
 class PercentChangedEvent(Event):
     event_name = "Percent_Changed"
 
-    def __init__(self, task_name: str, current_percent: float):
+    def __init__(self, task_name: str, current_percent: float, is_skipping: bool = False):
         super().__init__()
         self.task_name: str = task_name
         self.current_percent: float = current_percent
+        # the progress jumps over several elements at once instead of moving by one
+        self.is_skipping: bool = is_skipping
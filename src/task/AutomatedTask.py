@@ -1,18 +1,39 @@
 import logging
+import multiprocessing
+import os
+import threading
 import time
 import uuid
 from abc import abstractmethod, ABC
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
 from logging import Logger
-from typing import Callable
+from typing import Callable, TypeVar
 
+from src.common.AdaptiveTimingProfile import AdaptiveTimingProfile
+from src.common.CancellationToken import OperationCancelledException
+from src.common.CheckpointJournal import CheckpointJournal
+from src.common.FileUtil import get_excel_data_in_column_start_at_row, get_excel_data_in_columns_start_at_row, \
+    parse_excel_cell_position
 from src.common.Percentage import Percentage
+from src.common.ProcessTaskRelay import create_relaying_logger, perform_task_in_child_process, relay_child_process
 from src.common.ResumableThread import ResumableThread
+from src.common.RetryPolicy import RetryPolicy
+from src.common.StagePipeline import PipelineStage, StagePipeline
 from src.common.StringUtil import validate_keys_of_dictionary
-from src.common.ThreadLocalLogger import get_current_logger, create_thread_local_logger
+from src.common.TimingRecorder import TimingRecorder, timed_step, ELEMENT_STEP_NAME
+from src.common.ThreadLocalLogger import get_current_logger, create_thread_local_logger, bind_current_logger
+from src.setup.packaging.path.PathResolvingService import PathResolvingService
+
+
+T = TypeVar('T')
 
 
 class AutomatedTask(Percentage, ResumableThread, ABC):
+    # a CPU-bound task (e.g. PDF parsing) is performed in a child process to use another core instead of
+    # competing for the GIL with the other tasks, unless process.isolated = False
+    cpu_bound: bool = False
+
     @abstractmethod
     def mandatory_settings(self) -> list[str]:
         pass
@@ -44,11 +65,42 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
         else:
             self._timingFactor = float(self._settings.get('time.unit.factor'))
 
+        if self._settings.get('time.adaptive') is None:
+            self._is_adaptive_timing = False
+        else:
+            self._is_adaptive_timing = 'True'.lower() == str(self._settings.get('time.adaptive')).lower()
+        self._adaptive_timing_profile: AdaptiveTimingProfile | None = None
+
         if self._settings.get('use.GUI') is None:
             self.use_gui = False
         else:
             self.use_gui = 'True'.lower() == str(self._settings.get('use.GUI')).lower()
 
+        if self._settings.get('parallel.workers') is None:
+            self._parallel_workers = 1
+        else:
+            self._parallel_workers = max(1, int(self._settings.get('parallel.workers')))
+
+        if self._settings.get('process.isolated') is None:
+            self._is_process_isolated = self.cpu_bound
+        else:
+            self._is_process_isolated = 'True'.lower() == str(self._settings.get('process.isolated')).lower()
+        # set in the child process, where the log records are relayed to the parent instead of being written
+        self.relay_queue: multiprocessing.Queue | None = None
+
+        self._progress_lock = threading.Lock()
+        self.__input_columns_future: Future | None = None
+        # tells the tasks depending on this one whether the last perform() went through automate() without error
+        self.succeeded: bool = False
+        self._checkpoint_journal: CheckpointJournal | None = None
+        self.__checkpoint_element_keys: list[str] = []
+        self._timing_recorder: TimingRecorder = TimingRecorder()
+
+        if self._settings.get('pipeline.queue.size') is None:
+            self._pipeline_queue_size = 4
+        else:
+            self._pipeline_queue_size = max(1, int(self._settings.get('pipeline.queue.size')))
+
         if not self.use_gui:
             logger.info('Run in headless mode')
 
@@ -57,27 +109,175 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
         mandatory_settings.append('invoked_class')
         validate_keys_of_dictionary(self._settings, set(mandatory_settings))
 
-        logger: Logger = create_thread_local_logger(class_name=self._settings['invoked_class'],
-                                                    thread_uuid=str(uuid.uuid4()))
+        if self.relay_queue is None:
+            logger: Logger = create_thread_local_logger(class_name=self._settings['invoked_class'],
+                                                        thread_uuid=str(uuid.uuid4()))
+        else:
+            logger: Logger = create_relaying_logger(class_name=self._settings['invoked_class'],
+                                                    relay_queue=self.relay_queue)
 
         if self.callback_before_run_task is not None:
             self.callback_before_run_task()
 
+        if self._is_process_isolated and self.relay_queue is None:
+            self.__perform_in_child_process()
+        else:
+            self.__perform_in_current_process()
+        logger.info("Done task. It ends at {}".format(datetime.now()))
+        del logging.Logger.manager.loggerDict[self._settings['invoked_class']]
+
+    def __perform_in_current_process(self) -> None:
+        logger: Logger = get_current_logger()
+        self._timing_recorder = TimingRecorder()
+        self.__load_adaptive_timing_profile()
+        self.succeeded = False
         try:
+            self.__start_loading_input_columns()
+            self._prepare_before_automate()
+            self.__raise_if_input_columns_not_loadable()
             self.automate()
+            self.__complete_checkpoint_journal()
+            self.succeeded = not self.terminated
+        except OperationCancelledException:
+            logger.info("Task has been terminated")
         except Exception as exception:
             logger.exception(str(exception))
-        logger.info("Done task. It ends at {}".format(datetime.now()))
-        del logging.Logger.manager.loggerDict[self._settings['invoked_class']]
+        finally:
+            self._clean_up_after_automate()
+        self.__save_adaptive_timing_profile()
+        self.__export_timing_report()
+
+    def __perform_in_child_process(self) -> None:
+        logger: Logger = get_current_logger()
+        # spawn instead of fork, the same on every platform and safe with the threads of the parent
+        context = multiprocessing.get_context('spawn')
+        relay_queue: multiprocessing.Queue = context.Queue()
+        terminate_event = context.Event()
+        pause_event = context.Event()
+        process = context.Process(target=perform_task_in_child_process,
+                                  args=(self._settings, relay_queue, terminate_event, pause_event),
+                                  name=self._settings['invoked_class'],
+                                  daemon=False)
+        self.succeeded = False
+        process.start()
+        logger.info('Perform the task in the child process {}'.format(process.pid))
+        self.succeeded = relay_child_process(process, relay_queue, terminate_event, pause_event, self)
+
+    def _prepare_before_automate(self) -> None:
+        """ Prepare the resources the task needs (e.g. a browser) on the task thread, right before automate() """
+        pass
+
+    def _clean_up_after_automate(self) -> None:
+        """ Called after automate() whatever the way it ended, even by an exception or terminate() """
+        pass
+
+    def _input_column_settings(self) -> list[str]:
+        """
+            The settings holding the first cell of each input column the task reads from excel.path
+            (e.g. excel.column.so). They are checked before the task prepares anything, then the columns are loaded
+            in the background while it prepares (e.g. boots a browser), to be taken by _get_input_column
+        """
+        return []
+
+    def _get_input_column(self, column_setting: str) -> list[str]:
+        """ The values of the input column of the setting, waiting for the background loading if it is not over """
+        if self.__input_columns_future is None or column_setting not in self._input_column_settings():
+            return get_excel_data_in_column_start_at_row(self._settings['excel.path'],
+                                                         self._settings['excel.sheet'],
+                                                         self._settings[column_setting])
+        return self.__input_columns_future.result()[column_setting]
+
+    def __start_loading_input_columns(self) -> None:
+        self.__input_columns_future = None
+        column_settings: list[str] = self._input_column_settings()
+        if len(column_settings) == 0:
+            return
+
+        # fail fast on what can be checked right away, before any browser is started
+        excel_path: str = self._settings['excel.path']
+        if not os.path.isfile(excel_path):
+            raise Exception('The input file {} is not existed. Please providing it !'.format(excel_path))
+        start_cells: list[str] = [self._settings[column_setting] for column_setting in column_settings]
+        for start_cell in start_cells:
+            parse_excel_cell_position(start_cell)
+
+        logger: Logger = get_current_logger()
+
+        def load_input_columns() -> dict[str, list[str]]:
+            bind_current_logger(logger)
+            columns_values: list[list[str]] = get_excel_data_in_columns_start_at_row(excel_path,
+                                                                                    self._settings['excel.sheet'],
+                                                                                    start_cells)
+            return dict(zip(column_settings, columns_values))
+
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='InputLoader')
+        self.__input_columns_future = executor.submit(load_input_columns)
+        executor.shutdown(wait=False)
+
+    def __raise_if_input_columns_not_loadable(self) -> None:
+        # the loading is usually over once the task is prepared, an invalid input stops it before automate()
+        if self.__input_columns_future is not None and self.__input_columns_future.done():
+            self.__input_columns_future.result()
+
+    def release_resources(self) -> None:
+        """ Free what the task keeps between its runs (e.g. a warm browser), once it will not be performed again """
+        pass
 
     def perform_mainloop_on_collection(self,
                                        collection,
                                        critical_operation_on_each_element: Callable[[object], None]):
+        self.__perform_mainloop(collection, critical_operation_on_each_element, is_checkpointing_each_element=True)
+
+    def perform_pipeline_on_collection(self, collection, stages: list[PipelineStage]):
+        """
+            Like perform_mainloop_on_collection, but only the first stage is the per-element operation of the main
+            loop, the result of each stage is handed over to the next one running on its own thread through
+            a bounded queue, so the main loop moves on to the next element while the earlier ones are still
+            in the later stages. An element is checkpointed once it went through the last stage
+        """
+        logger: Logger = get_current_logger()
+        pipeline: StagePipeline = StagePipeline(stages=stages,
+                                                queue_size=self._pipeline_queue_size,
+                                                cancellation_token=self.cancellation_token,
+                                                on_element_completed=lambda element: self._checkpoint_element(
+                                                    str(element)))
+        pipeline.start()
+        try:
+            self.__perform_mainloop(collection, pipeline.submit, is_checkpointing_each_element=False)
+        finally:
+            pipeline.close()
+            for statistics in pipeline.get_statistics():
+                logger.info(str(statistics))
+
+    def __perform_mainloop(self,
+                           collection,
+                           critical_operation_on_each_element: Callable[[object], None],
+                           is_checkpointing_each_element: bool):
         self.current_element_count = 0
         self.total_element_size = len(collection)
+
+        self._open_checkpoint_journal([str(element) for element in collection])
+        remaining_collection: list = [element for element in collection
+                                      if not self._is_element_checkpointed(str(element))]
+        # published as a jump, the GUI only follows an ordinary progress by one element at a time
+        self.skip_to_element_count(len(collection) - len(remaining_collection))
+        collection = remaining_collection
+
+        if self._parallel_workers <= 1 or len(collection) <= 1:
+            self.__perform_mainloop_on_shard(collection, critical_operation_on_each_element,
+                                             is_checkpointing_each_element)
+            return
+
+        self.__perform_mainloop_on_shards(list(collection), critical_operation_on_each_element,
+                                          is_checkpointing_each_element)
+
+    def __perform_mainloop_on_shard(self,
+                                    shard,
+                                    critical_operation_on_each_element: Callable[[object], None],
+                                    is_checkpointing_each_element: bool):
         logger: Logger = get_current_logger()
 
-        for each_element in collection:
+        for each_element in shard:
 
             if self.terminated is True:
                 return
@@ -91,9 +291,224 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
                 if self.terminated is True:
                     return
 
-            critical_operation_on_each_element(each_element)
-            self.current_element_count = self.current_element_count + 1
+            with self._timing_recorder.span(ELEMENT_STEP_NAME):
+                critical_operation_on_each_element(each_element)
+            if is_checkpointing_each_element:
+                self._checkpoint_element(str(each_element))
+            with self._progress_lock:
+                self.current_element_count = self.current_element_count + 1
+
+    def __perform_mainloop_on_shards(self,
+                                     collection: list,
+                                     critical_operation_on_each_element: Callable[[object], None],
+                                     is_checkpointing_each_element: bool):
+        logger: Logger = get_current_logger()
+        failures: list[Exception] = []
+
+        def work_on_shard(shard: list) -> None:
+            bind_current_logger(logger)
+            try:
+                try:
+                    # inside, a setup failing halfway (e.g. its login) still releases what it prepared
+                    self._setup_worker_context()
+                    self.__perform_mainloop_on_shard(shard, critical_operation_on_each_element,
+                                                     is_checkpointing_each_element)
+                finally:
+                    self._teardown_worker_context()
+            except OperationCancelledException:
+                logger.info('Worker has been terminated')
+            except Exception as exception:
+                logger.exception(str(exception))
+                failures.append(exception)
+
+        number_of_workers: int = self._prepare_parallel_workers(min(self._parallel_workers, len(collection)))
+        try:
+            shards: list[list] = [collection[index::number_of_workers] for index in range(number_of_workers)]
+            logger.info('Shard {} elements across {} workers'.format(len(collection), number_of_workers))
+
+            # the first shard stays on the current thread, reusing the context the task has already prepared
+            worker_threads: list[threading.Thread] = []
+            for shard in shards[1:]:
+                worker_thread: threading.Thread = threading.Thread(target=work_on_shard, args=[shard], daemon=False)
+                worker_thread.start()
+                worker_threads.append(worker_thread)
+
+            try:
+                self.__perform_mainloop_on_shard(shards[0], critical_operation_on_each_element,
+                                                 is_checkpointing_each_element)
+            finally:
+                for worker_thread in worker_threads:
+                    worker_thread.join()
+        finally:
+            self._finish_parallel_workers()
+
+        if len(failures) > 0:
+            raise failures[0]
+
+    def _wait_until(self,
+                    condition: Callable[[], T],
+                    operation_key: str,
+                    timeout: float,
+                    poll_interval: float = 1) -> T:
+        """
+            Poll the condition until it returns a truthy value, which is returned, or raise TimeoutError.
+            The timeout and the poll interval are in time units scaled by time.unit.factor, with time.adaptive
+            the poll interval is tuned by the latencies observed for the same operation_key in this run and
+            the previous ones
+        """
+        timeout = timeout * self._timingFactor
+        poll_interval = poll_interval * self._timingFactor
+        if self._adaptive_timing_profile is not None:
+            poll_interval = self._adaptive_timing_profile.tune_poll_interval(operation_key, poll_interval)
+
+        start_time: float = time.monotonic()
+        while True:
+            result: T = condition()
+            elapsed: float = time.monotonic() - start_time
+            if result:
+                if self._adaptive_timing_profile is not None:
+                    self._adaptive_timing_profile.observe(operation_key, elapsed)
+                return result
+
+            if elapsed >= timeout:
+                raise TimeoutError('Timeout after {:.2f}s waiting for {}'.format(elapsed, operation_key))
+
+            self._poll_sleep(min(poll_interval, max(0.0, timeout - elapsed)))
+
+    def __load_adaptive_timing_profile(self) -> None:
+        if not self._is_adaptive_timing:
+            return
+
+        profile_dir: str = PathResolvingService.get_instance().resolve('output', 'timing')
+        profile_path: str = os.path.join(profile_dir, '{}.json'.format(self._settings['invoked_class']))
+        self._adaptive_timing_profile = AdaptiveTimingProfile(profile_path=profile_path)
+
+    def __save_adaptive_timing_profile(self) -> None:
+        if self._adaptive_timing_profile is None:
+            return
+
+        logger: Logger = get_current_logger()
+        try:
+            self._adaptive_timing_profile.save()
+        except Exception as exception:
+            logger.error('Can not save the adaptive timing profile: {}'.format(exception))
+
+    def __export_timing_report(self) -> None:
+        logger: Logger = get_current_logger()
+        try:
+            report_dir: str = PathResolvingService.get_instance().resolve('output', 'report')
+            report_name: str = '{}_{}'.format(self._settings['invoked_class'], datetime.now().strftime('%Y%m%d_%H%M%S'))
+            json_path, csv_path = self._timing_recorder.export(report_dir=report_dir, report_name=report_name)
+            logger.info('Timing report has been written to {} and {}'.format(json_path, csv_path))
+        except Exception as exception:
+            logger.error('Can not write the timing report: {}'.format(exception))
+
+    def _open_checkpoint_journal(self, element_keys: list[str]) -> None:
+        """
+            Opt-in by checkpoint.enabled, bind the journal of this task to the current input so that
+            the elements processed by a previous crashed run will be skipped
+        """
+        if 'True'.lower() != str(self._settings.get('checkpoint.enabled')).lower():
+            return
+
+        logger: Logger = get_current_logger()
+        # The input file itself is not hashed because some tasks write their statuses back into it
+        fingerprint: str = CheckpointJournal.compute_fingerprint(self._settings.get('excel.path'), element_keys)
+        checkpoint_dir: str = PathResolvingService.get_instance().resolve('output', 'checkpoint')
+        journal_path: str = os.path.join(checkpoint_dir, '{}.jsonl'.format(self._settings['invoked_class']))
+        self._checkpoint_journal = CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint)
+        self.__checkpoint_element_keys = [str(key) for key in element_keys]
+
+        if self._checkpoint_journal.done_count > 0:
+            logger.info('Resume from checkpoint, skip {} already processed elements'
+                        .format(self._checkpoint_journal.done_count))
+
+    def _is_element_checkpointed(self, key: str) -> bool:
+        if self._checkpoint_journal is None:
+            return False
+        return self._checkpoint_journal.is_done(key)
+
+    def _checkpoint_element(self, key: str) -> None:
+        if self._checkpoint_journal is None:
+            return
+        self._checkpoint_journal.mark_done(key)
+
+    def __complete_checkpoint_journal(self) -> None:
+        # a run which went through every element is reset for the next run, a terminated one or one which failed
+        # on some elements (e.g. in a later stage of a pipeline) keeps its records to resume them later
+        if self._checkpoint_journal is None:
+            return
+        if not self.terminated and all(self._checkpoint_journal.is_done(key)
+                                       for key in self.__checkpoint_element_keys):
+            self._checkpoint_journal.reset()
+        else:
+            get_current_logger().info('Keep the checkpoint, {} of {} elements have been processed'
+                                      .format(self._checkpoint_journal.done_count,
+                                              len(self.__checkpoint_element_keys)))
+        self._checkpoint_journal = None
+
+    def _prepare_parallel_workers(self, number_of_workers: int) -> int:
+        """
+            Called on the current thread before the extra workers start, prepare what the workers share with it
+            (e.g. a browser whose tabs are the workers) and reserve what they need up front, return how many
+            workers, the current thread included, can run (e.g. fewer than asked when the browsers are scarce)
+        """
+        return number_of_workers
+
+    def _finish_parallel_workers(self) -> None:
+        """ Called on the current thread once all the extra workers are over """
+        pass
+
+    def _setup_worker_context(self) -> None:
+        """
+            Called on each extra worker thread before it starts working on its shard,
+            prepare the per-worker resources here (e.g. an own browser)
+        """
+        pass
+
+    def _teardown_worker_context(self) -> None:
+        """
+            Called on each extra worker thread after it finished its shard, release what was prepared
+            in _setup_worker_context, also when the setup itself failed halfway
+        """
+        pass
+
+    def _create_retry_policy(self,
+                             max_attempts: int = 5,
+                             initial_delay: float = 0.5,
+                             max_delay: float = 8.0,
+                             max_elapsed: float = None,
+                             retryable_exceptions: tuple[type[BaseException], ...] = (Exception,)) -> RetryPolicy:
+        # delays are expressed in time units, scaled by time.unit.factor like every other wait of the task
+        return RetryPolicy(max_attempts=max_attempts,
+                           initial_delay=initial_delay * self._timingFactor,
+                           max_delay=max_delay * self._timingFactor,
+                           max_elapsed=None if max_elapsed is None else max_elapsed * self._timingFactor,
+                           retryable_exceptions=retryable_exceptions,
+                           sleep=self._sleep)
 
     def sleep(self) -> None:
-        time.sleep(self._timingFactor)
+        self._sleep(self._timingFactor)
         return
+
+    @timed_step('sleep')
+    def _sleep(self, seconds: float) -> None:
+        """
+            Sleep which reacts to the GUI buttons while sleeping: it raises OperationCancelledException
+            right after terminate() and blocks while the task is paused
+        """
+        self._poll_sleep(seconds)
+
+    def _poll_sleep(self, seconds: float) -> None:
+        """
+            Like _sleep, between two checks of a poll (e.g. _wait_until), it is not recorded as a sleep step
+            since each poll is a short slice of a wait which is timed as a whole
+        """
+        self.cancellation_token.sleep(seconds)
+        self._wait_while_paused()
+
+    def _wait_while_paused(self) -> None:
+        with self.pause_condition:
+            while self.paused and not self.terminated:
+                self.pause_condition.wait()
+        self.cancellation_token.raise_if_cancelled()
@@ -31,11 +31,8 @@ class DesktopTask(AutomatedTask, ABC):
         return False
 
     def _wait_for_window(self, title):
-        max_attempt: int = 30
-        current_attempt: int = 0
-
-        while current_attempt < max_attempt:
 
+        def activate_window_if_present() -> str | None:
             window_titles: list[str] = gw.getAllTitles()
 
             for window_title in window_titles:
@@ -43,10 +40,14 @@ class DesktopTask(AutomatedTask, ABC):
                     gw.getWindowsWithTitle(window_title)[0].activate()
                     return window_title
 
-            current_attempt += 1
-            self.sleep()
+            return None
 
-        raise Exception('Can not find out the asked window {}'.format(title))
+        try:
+            return self._wait_until(condition=activate_window_if_present,
+                                    operation_key='window {}'.format(title),
+                                    timeout=30)
+        except TimeoutError:
+            raise Exception('Can not find out the asked window {}'.format(title))
 
     def _hotkey_then_close_current_window(self, *args: Any) -> WindowSpecification:
         self._window_title_stack.pop()
@@ -1,25 +1,57 @@
 import logging
 import os
+import threading
 import time
 from abc import ABC
+from concurrent.futures import Future
+from contextlib import contextmanager
 from logging import Logger
-from typing import Callable
+from typing import Callable, Iterator
+from urllib.parse import urlparse
 
 from selenium import webdriver
-from selenium.common import TimeoutException
+from selenium.common import TimeoutException, NoSuchElementException, StaleElementReferenceException, \
+    WebDriverException
 from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver as AnyDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
-from selenium.webdriver.support.wait import WebDriverWait
 
+from src.common.BrowserBudget import BrowserBudget
+from src.common.BrowserTabGroup import BrowserTabGroup, BrowserTab
+from src.common.DownloadWatcher import DownloadWatcher
+from src.common.HostRateLimiter import HostRateLimiter
+from src.common.HttpDocumentFetcher import HttpDocumentFetcher
+from src.common.SessionStore import SessionStore
 from src.common.ThreadLocalLogger import get_current_logger
+from src.common.TimingRecorder import timed_step
+from src.common.WebDriverPool import WebDriverPool
 from src.setup.driver.download.DownloadDriver import DownloadDriver
 from src.setup.driver.download.DownloadDriverFactory import DownloadDriverFactory
+from src.setup.packaging.path.PathResolvingService import PathResolvingService
 from src.task.AutomatedTask import AutomatedTask
 
 
 class WebTask(AutomatedTask, ABC):
+    # in time units, the element waits check their condition this often instead of sleeping a fixed time first
+    ELEMENT_POLL_INTERVAL: float = 0.1
+    # in time units, how long the login form is given to show up before a session is considered logged in
+    LOGIN_FORM_PROBE_TIME: int = 3
+    # in time units, how often a navigation or the readiness of a page is checked
+    NAVIGATION_POLL_INTERVAL: float = 0.1
+    PAGE_LOAD_STRATEGIES: list[str] = ['normal', 'eager', 'none']
+    # the resource types browser.block.resources accepts, with the URL patterns blocking them
+    BLOCKABLE_RESOURCE_PATTERNS: dict[str, list[str]] = {
+        'images': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico', '*.bmp'],
+        'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+        'stylesheets': ['*.css'],
+        'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav']
+    }
+    # a headless browser is never looked at, it skips what only matters to the eyes and the tracking scripts
+    DEFAULT_HEADLESS_BLOCKED_RESOURCES: list[str] = ['images', 'fonts', 'media']
+    DEFAULT_HEADLESS_BLOCKED_URLS: list[str] = ['*google-analytics.com*', '*googletagmanager.com*',
+                                                '*doubleclick.net*', '*hotjar.com*', '*clarity.ms*']
 
     def __init__(self,
                  settings: dict[str, str],
@@ -41,13 +73,428 @@ class WebTask(AutomatedTask, ABC):
                 os.makedirs(self._download_folder)
                 logger.info(f"Create folder '{self._download_folder}' because it is not existed by default")
 
+        self._download_watcher: DownloadWatcher | None = None
+        if self._download_folder is not None:
+            self._download_watcher = DownloadWatcher(self._download_folder)
+        # the documents with a known URL are fetched over HTTP with the session of the browser instead of clicked,
+        # at most download.direct.max_concurrent at the same time
+        if self._settings.get('download.direct') is None:
+            self._is_downloading_directly = False
+        else:
+            self._is_downloading_directly = 'True'.lower() == str(self._settings.get('download.direct')).lower()
+        if self._settings.get('download.direct.max_concurrent') is None:
+            self._direct_download_max_concurrent = 4
+        else:
+            self._direct_download_max_concurrent = int(self._settings.get('download.direct.max_concurrent'))
+        self.__http_document_fetcher: HttpDocumentFetcher | None = None
+        # target path of a direct download -> its fetch
+        self.__direct_downloads: dict[str, Future] = {}
+        self.__direct_downloads_lock: threading.Lock = threading.Lock()
+
+        # a warm browser outlives the run to be reused by the next perform() of the same task instance
+        if self._settings.get('browser.keep_warm') is None:
+            self._is_keeping_browser_warm = False
+        else:
+            self._is_keeping_browser_warm = 'True'.lower() == str(self._settings.get('browser.keep_warm')).lower()
+        # a warm browser is restarted once older than browser.recycle.minutes or after browser.recycle.pages pages
+        if self._settings.get('browser.recycle.minutes') is None:
+            self._browser_recycle_seconds = 60 * 60
+        else:
+            self._browser_recycle_seconds = float(self._settings.get('browser.recycle.minutes')) * 60
+        if self._settings.get('browser.recycle.pages') is None:
+            self._browser_recycle_pages = 1000
+        else:
+            self._browser_recycle_pages = int(self._settings.get('browser.recycle.pages'))
+        # a pooled browser is given back to the process-wide pool after the run instead of being closed,
+        # to be lent to the next run with the same options, it is quit after browser.pool.max_uses runs
+        if self._settings.get('browser.pooled') is None:
+            self._is_pooling_browser = False
+        else:
+            self._is_pooling_browser = 'True'.lower() == str(self._settings.get('browser.pooled')).lower()
+        if self._settings.get('browser.pool.max_uses') is None:
+            self._browser_pool_max_uses = 20
+        else:
+            self._browser_pool_max_uses = int(self._settings.get('browser.pool.max_uses'))
+        # a persisted session (cookies, local storage) is saved encrypted after the login and restored by the next
+        # runs of the site and user, which only log in again once it has expired
+        if self._settings.get('session.persisted') is None:
+            self._is_persisting_session = False
+        else:
+            self._is_persisting_session = 'True'.lower() == str(self._settings.get('session.persisted')).lower()
+        self._session_store: SessionStore | None = None
+        if self._is_persisting_session:
+            self._session_store = SessionStore(PathResolvingService.get_instance().resolve('output', 'session'))
+        # with eager (or none) a page is handed over once its DOM is parsed (or right away), before its images and
+        # scripts are loaded, the page is then ready when interactive and quiet for browser.network_idle_ms
+        if self._settings.get('browser.page_load_strategy') is None:
+            self._page_load_strategy = 'normal'
+        else:
+            self._page_load_strategy = str(self._settings.get('browser.page_load_strategy')).strip().lower()
+        if self._page_load_strategy not in self.PAGE_LOAD_STRATEGIES:
+            raise Exception('The browser.page_load_strategy {} is not one of {}'
+                            .format(self._page_load_strategy, ', '.join(self.PAGE_LOAD_STRATEGIES)))
+        if self._settings.get('browser.network_idle_ms') is None:
+            self._network_idle_ms = 0
+        else:
+            self._network_idle_ms = int(self._settings.get('browser.network_idle_ms'))
+        # the resources not needed by the automation are not loaded: types of BLOCKABLE_RESOURCE_PATTERNS in
+        # browser.block.resources and URL patterns (* as wildcard) in browser.block.urls, 'none' to block nothing
+        if self._settings.get('browser.block.resources') is None:
+            self._blocked_resources = [] if self.use_gui else list(self.DEFAULT_HEADLESS_BLOCKED_RESOURCES)
+        else:
+            self._blocked_resources = [blocked_resource.lower() for blocked_resource in
+                                       self.__parse_blocking_list(self._settings.get('browser.block.resources'))]
+        for blocked_resource in self._blocked_resources:
+            if blocked_resource not in self.BLOCKABLE_RESOURCE_PATTERNS:
+                raise Exception('The resource type {} of browser.block.resources is not one of {}'
+                                .format(blocked_resource, ', '.join(self.BLOCKABLE_RESOURCE_PATTERNS)))
+        if self._settings.get('browser.block.urls') is None:
+            self._blocked_urls = [] if self.use_gui else list(self.DEFAULT_HEADLESS_BLOCKED_URLS)
+        else:
+            self._blocked_urls = self.__parse_blocking_list(self._settings.get('browser.block.urls'))
+        self.__browser_started_at: float = 0
+        self.__browser_page_count: int = 0
+        # the parallel workers navigate from their own threads
+        self.__browser_page_count_lock: threading.Lock = threading.Lock()
+
+        # the parallel workers work in tabs of the task's browser, sharing its session, rather than in browsers
+        # of their own
+        if self._settings.get('parallel.tabs') is None:
+            self._is_working_in_tabs = False
+        else:
+            self._is_working_in_tabs = 'True'.lower() == str(self._settings.get('parallel.tabs')).lower()
+        self.__tab_group: BrowserTabGroup | None = None
+        self.__main_tab: WebDriver | None = None
+        # how many parallel runs in tabs and isolated contexts use the tab group, it is dropped once none does
+        self.__tab_group_users: int = 0
+        self.__tab_group_lock: threading.Lock = threading.Lock()
+
+        self._worker_context: threading.local = threading.local()
         self._driver: WebDriver = None
+        # id of a started driver -> its lease in the browser budget
+        self.__browser_leases: dict[int, int] = {}
+        # the leases reserved for the browsers of the parallel workers, not started yet
+        self.__reserved_worker_leases: list[int] = []
+        self.__reserved_worker_leases_lock: threading.Lock = threading.Lock()
+
+        HostRateLimiter.get_instance().configure_from_settings(self._settings)
+
+    @property
+    def _driver(self) -> WebDriver:
+        # each parallel worker drives its own browser, the others share the task's one
+        worker_driver: WebDriver = getattr(self._worker_context, 'driver', None)
+        if worker_driver is not None:
+            return worker_driver
+        # while the workers are tabs, the other threads drive the main tab of the shared browser
+        if self.__main_tab is not None:
+            return self.__main_tab
+        return self._main_driver
+
+    @_driver.setter
+    def _driver(self, driver: WebDriver):
+        self._main_driver = driver
+
+    def _prepare_before_automate(self) -> None:
+        logger: Logger = get_current_logger()
+        if self._download_watcher is not None:
+            self._download_watcher.start()
+
+        if self._is_keeping_browser_warm and self._driver is not None:
+            browser_age: float = time.monotonic() - self.__browser_started_at
+            with self.__browser_page_count_lock:
+                browser_page_count: int = self.__browser_page_count
+            if browser_age >= self._browser_recycle_seconds or browser_page_count >= self._browser_recycle_pages:
+                logger.info('Recycle the warm browser after {:.0f} minutes and {} pages'
+                            .format(browser_age / 60, browser_page_count))
+                self.__quit_driver()
+            elif self.__is_driver_responsive():
+                logger.info('Reuse the warm browser')
+                return
+            else:
+                logger.info('The warm browser is not responding, start a new one')
+                self.__quit_driver()
 
-    def perform(self) -> None:
         self._driver: WebDriver = self._setup_driver()
-        super().perform()
+        self.__browser_started_at = time.monotonic()
+        with self.__browser_page_count_lock:
+            self.__browser_page_count = 0
+
+    def _clean_up_after_automate(self) -> None:
+        if self._download_watcher is not None:
+            self._download_watcher.stop()
+        with self.__direct_downloads_lock:
+            if self.__http_document_fetcher is not None:
+                self.__http_document_fetcher.close()
+                self.__http_document_fetcher = None
+            self.__direct_downloads.clear()
+
+        if self._driver is None:
+            return
+
+        if self.terminated:
+            # free the browser right away instead of leaving it behind the terminated task
+            self.__quit_driver()
+        elif self._is_keeping_browser_warm:
+            self.__empty_warm_browser()
+        elif self._is_pooling_browser:
+            self.__give_back_driver(self._driver)
+            self._driver = None
+        else:
+            # quit even when _close_browser() closed its window, the run may have failed before, and the lease
+            # is only released once the browser is really gone
+            self.__quit_driver()
+            self._driver = None
+
+    def release_resources(self) -> None:
+        if self._driver is not None:
+            self.__quit_driver()
+            self._driver = None
+
+    def _close_browser(self) -> None:
+        """ Close the browser at the end of a run, a warm browser is only emptied to be reused by the next run """
+        if self._is_keeping_browser_warm:
+            self.__empty_warm_browser()
+            return
+
+        if self._is_pooling_browser:
+            # emptied by the pool once given back
+            return
+
+        self._driver.close()
+
+    def __empty_warm_browser(self) -> None:
+        # keep a single blank tab, the session cookies stay for the next run
+        logger: Logger = get_current_logger()
+        try:
+            window_handles: list[str] = self._driver.window_handles
+            for window_handle in window_handles[1:]:
+                self._driver.switch_to.window(window_handle)
+                self._driver.close()
+            self._driver.switch_to.window(window_handles[0])
+            self._driver.get('about:blank')
+        except Exception as exception:
+            logger.warning('Can not empty the warm browser, it will be restarted: {}'.format(exception))
+            self.__quit_driver()
+            self._driver = None
+
+    def __is_driver_responsive(self) -> bool:
+        try:
+            return len(self._driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def __count_browser_page(self) -> None:
+        with self.__browser_page_count_lock:
+            self.__browser_page_count += 1
+
+    def __quit_driver(self) -> None:
+        logger: Logger = get_current_logger()
+        if self._is_pooling_browser:
+            self.__give_back_driver(self._driver, is_reusable=False)
+            return
+
+        try:
+            self._driver.quit()
+        except Exception as exception:
+            logger.debug('The browser has been closed already: {}'.format(exception))
+        self.__release_browser_lease(self._driver)
+
+    def __give_back_driver(self, driver: WebDriver, is_reusable: bool = True) -> None:
+        try:
+            WebDriverPool.get_instance().give_back(options_key=self.__get_browser_options_key(),
+                                                   driver=driver,
+                                                   max_uses=self._browser_pool_max_uses,
+                                                   is_reusable=is_reusable)
+        finally:
+            self.__release_browser_lease(driver)
+
+    def __get_browser_options_key(self) -> str:
+        # blocking the images and the page load strategy are fixed when the browser starts
+        options_key: str = 'gui' if self.use_gui else 'headless'
+        if self._page_load_strategy != 'normal':
+            options_key += '-' + self._page_load_strategy
+        if 'images' in self._blocked_resources:
+            options_key += '-without-images'
+        return options_key
+
+    @staticmethod
+    def __parse_blocking_list(value: str) -> list[str]:
+        items: list[str] = [item.strip() for item in value.split(',') if item.strip() != '']
+        if len(items) == 1 and items[0].lower() == 'none':
+            return []
+        return items
+
+    def __apply_blocking_profile(self, driver: WebDriver) -> None:
+        """
+            Block the URLs of the profile in the current window of the driver, a pooled browser may come with
+            the ones of another task. CDP blocks them per window, each new window must get the profile too
+        """
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.__get_blocked_url_patterns()})
+
+    def __get_blocked_url_patterns(self) -> list[str]:
+        blocked_url_patterns: list[str] = list(self._blocked_urls)
+        for blocked_resource in self._blocked_resources:
+            blocked_url_patterns.extend(self.BLOCKABLE_RESOURCE_PATTERNS[blocked_resource])
+        return blocked_url_patterns
+
+    def _switch_to_window(self, window_handle: str) -> None:
+        """
+            Switch to a window, e.g. a popup opened by the site, and block the resources of the profile in it too.
+            A popup has usually loaded its first page by then, only its next loads are spared what is blocked
+        """
+        self._driver.switch_to.window(window_handle)
+        if len(self.__get_blocked_url_patterns()) > 0:
+            self.__apply_blocking_profile(self._driver)
+
+    def __release_browser_lease(self, driver: WebDriver) -> None:
+        lease_id: int | None = self.__browser_leases.pop(id(driver), None)
+        if lease_id is not None:
+            BrowserBudget.get_instance().release(lease_id)
+
+    def _prepare_parallel_workers(self, number_of_workers: int) -> int:
+        logger: Logger = get_current_logger()
+        if self._is_working_in_tabs:
+            self.__use_tab_group()
+            return number_of_workers
+
+        # the browsers of the workers are reserved all at once, the task holding its own browser meanwhile
+        browser_budget: BrowserBudget = BrowserBudget.get_instance()
+        while len(self.__reserved_worker_leases) < number_of_workers - 1:
+            lease_id: int | None = browser_budget.try_acquire()
+            if lease_id is None:
+                break
+            self.__reserved_worker_leases.append(lease_id)
+
+        available_number_of_workers: int = len(self.__reserved_worker_leases) + 1
+        if available_number_of_workers < number_of_workers:
+            logger.warning('The browser budget only allows {} of the {} workers'
+                           .format(available_number_of_workers, number_of_workers))
+        return available_number_of_workers
+
+    def _finish_parallel_workers(self) -> None:
+        if self._is_working_in_tabs:
+            self.__stop_using_tab_group()
+            return
+
+        # the reservations of the workers which could not start a browser
+        with self.__reserved_worker_leases_lock:
+            while len(self.__reserved_worker_leases) > 0:
+                BrowserBudget.get_instance().release(self.__reserved_worker_leases.pop())
+
+    @contextmanager
+    def _in_isolated_context(self, download_folder: str = None) -> Iterator[WebDriver]:
+        """
+            Run the block in a new browser context of the task's browser, with its own cookies, storage and
+            download folder (the task's one by default), e.g. to log in with another account without starting
+            another browser. The helpers of the task drive that context on the current thread until the block ends
+        """
+        tab_group: BrowserTabGroup = self.__use_tab_group()
+        previous_worker_driver: WebDriver | None = getattr(self._worker_context, 'driver', None)
+        try:
+            isolated_tab: WebDriver = tab_group.open_isolated_tab(
+                download_folder=self._download_folder if download_folder is None else download_folder)
+            self._worker_context.driver = isolated_tab
+            try:
+                self.__apply_blocking_profile(isolated_tab)
+                yield isolated_tab
+            finally:
+                self._worker_context.driver = previous_worker_driver
+                tab_group.close_tab(isolated_tab)
+        finally:
+            self.__stop_using_tab_group()
+
+    def __use_tab_group(self) -> BrowserTabGroup:
+        with self.__tab_group_lock:
+            if self.__tab_group is None:
+                self.__tab_group = BrowserTabGroup(self._main_driver)
+                self.__main_tab = self.__tab_group.main_tab()
+            self.__tab_group_users += 1
+            return self.__tab_group
+
+    def __stop_using_tab_group(self) -> None:
+        with self.__tab_group_lock:
+            self.__tab_group_users -= 1
+            if self.__tab_group_users == 0:
+                self.__tab_group = None
+                self.__main_tab = None
+
+    def __is_in_shared_tab(self) -> bool:
+        driver: WebDriver = self._driver
+        return isinstance(driver, BrowserTab) and driver.tab_browser_context_id is None
+
+    def _setup_worker_context(self) -> None:
+        logger: Logger = get_current_logger()
+        if self._is_working_in_tabs:
+            logger.info('Open a new tab for the worker')
+            self._worker_context.driver = self.__tab_group.open_tab()
+            self.__apply_blocking_profile(self._worker_context.driver)
+        else:
+            logger.info('Start a new browser for the worker')
+            with self.__reserved_worker_leases_lock:
+                lease_id: int = self.__reserved_worker_leases.pop()
+            self._worker_context.driver = self._setup_driver(lease_id=lease_id)
+        self._prepare_worker_driver()
+
+    def _teardown_worker_context(self) -> None:
+        worker_driver: WebDriver = getattr(self._worker_context, 'driver', None)
+        if worker_driver is None:
+            return
+
+        self._worker_context.driver = None
+        if self._is_working_in_tabs:
+            self.__tab_group.close_tab(worker_driver)
+            return
+
+        if self._is_pooling_browser:
+            self.__give_back_driver(worker_driver, is_reusable=not self.terminated)
+            return
+
+        try:
+            worker_driver.quit()
+        finally:
+            self.__release_browser_lease(worker_driver)
+
+    def _prepare_worker_driver(self) -> None:
+        """
+            Bring the fresh browser of a parallel worker to the state the per-element operation expects,
+            e.g. open the site and log in. Override it in tasks which support parallel.workers
+        """
+        pass
+
+    @timed_step('setup_driver')
+    def _setup_driver(self, lease_id: int = None) -> WebDriver:
+        """ Start a browser under a new lease of the browser budget, or the one reserved already (e.g. by a worker) """
+        browser_budget: BrowserBudget = BrowserBudget.get_instance()
+        if lease_id is None:
+            lease_id = browser_budget.acquire(self.cancellation_token)
+        try:
+            if self._is_pooling_browser:
+                driver: WebDriver = WebDriverPool.get_instance().lease(options_key=self.__get_browser_options_key(),
+                                                                       create_driver=self.__start_driver,
+                                                                       download_folder=self._download_folder)
+            else:
+                driver: WebDriver = self.__start_driver()
+        except BaseException:
+            browser_budget.release(lease_id)
+            raise
+
+        browser_budget.attach_process(lease_id, driver.service.process.pid)
+        self.__browser_leases[id(driver)] = lease_id
+        try:
+            self.__apply_blocking_profile(driver)
+        except BaseException:
+            if self._is_pooling_browser:
+                self.__give_back_driver(driver, is_reusable=False)
+                raise
+            try:
+                driver.quit()
+            finally:
+                self.__release_browser_lease(driver)
+            raise
+        return driver
 
-    def _setup_driver(self) -> WebDriver:
+    def __start_driver(self) -> WebDriver:
         driver_downloader: DownloadDriver = DownloadDriverFactory.get_downloader()
         driver_asb_path: str = driver_downloader.get_expected_driver_abs_path()
 
@@ -61,6 +508,7 @@ class WebTask(AutomatedTask, ABC):
         else:
             options.add_argument("--start-maximized")
 
+        options.page_load_strategy = self._page_load_strategy
         options.add_argument('--disable-extensions')
         options.add_argument('--disable-infobars')
         options.add_argument('--disable-notifications')
@@ -75,6 +523,8 @@ class WebTask(AutomatedTask, ABC):
         }
         if not self.use_gui:
             prefs['plugins.always_open_pdf_externally'] = True
+        if 'images' in self._blocked_resources:
+            prefs['profile.managed_default_content_settings.images'] = 2
 
         options.add_experimental_option("prefs", prefs)
 
@@ -85,47 +535,115 @@ class WebTask(AutomatedTask, ABC):
         driver: webdriver.Chrome = webdriver.Chrome(service=service, options=options)
         return driver
 
+    @timed_step('wait_download_file_complete')
     def _wait_download_file_complete(self, file_path: str) -> None:
         logger: Logger = get_current_logger()
         logger.info(r'Waiting for downloading {} complete'.format(file_path))
-        attempt_counting: int = 0
-        max_attempt: int = 60 * 3
-        while True:
-            if attempt_counting > max_attempt:
-                raise Exception('The webapp waiting too long to download {}. Please check'.format(file_path))
+        with self.__direct_downloads_lock:
+            direct_download: Future | None = self.__direct_downloads.pop(file_path, None)
+        if direct_download is not None:
+            self._wait_download_complete(lambda timeout: self.__http_document_fetcher.wait(direct_download, timeout),
+                                         description=file_path)
+            logger.info(r'Downloading {} complete'.format(file_path))
+            return
+
+        self._wait_download_complete(lambda timeout: self._download_watcher.wait_for_file(file_path,
+                                                                                         timeout,
+                                                                                         self.cancellation_token),
+                                     description=file_path)
+        logger.info(r'Downloading {} complete'.format(file_path))
 
-            if not os.path.exists(file_path):
-                time.sleep(1 * self._timingFactor)
-                attempt_counting += 1
-                continue
+    @contextmanager
+    def _expecting_download_start(self, timeout: float = 60) -> Iterator[None]:
+        """
+            Run the block which makes the browser download a file (e.g. a click on a button without href), then
+            wait until the browser has started writing it into the download folder, so the page can be left
+            without cancelling the download. The timeout is in time units
+        """
+        if self._download_watcher is None:
+            yield
+            return
+
+        previous_file_names: set[str] = self._download_watcher.list_file_names()
+        yield
+        try:
+            new_file_path: str = self._download_watcher.wait_for_new_file(previous_file_names,
+                                                                          timeout * self._timingFactor,
+                                                                          self.cancellation_token)
+        except TimeoutError:
+            raise TimeoutError('The browser has not started the download after {} time units'.format(timeout))
+        get_current_logger().info('The download into {} has started'.format(new_file_path))
+
+    def _download_from_link(self, by: str, value: str, file_path: str) -> bool:
+        """
+            Download the document of a link into file_path: fetched over HTTP with the session of the browser
+            when download.direct is on and the link has a URL, clicked otherwise. Return True when it is fetched,
+            then _wait_download_file_complete(file_path) waits for the fetch, while a clicked document is saved by
+            the browser under the name given by the site, it is returned once the browser has started saving it
+        """
+        link: WebElement = self._get_when_element_present(by=by, value=value)
+        url: str | None = link.get_attribute('href') if self._is_downloading_directly else None
+        if url is None or not url.lower().startswith(('http://', 'https://')):
+            with self._expecting_download_start():
+                self.__acquire_request_slot()
+                link.click()
+            return False
+
+        with self.__direct_downloads_lock:
+            if self.__http_document_fetcher is None:
+                self.__http_document_fetcher = HttpDocumentFetcher(max_concurrent=self._direct_download_max_concurrent,
+                                                                   cancellation_token=self.cancellation_token)
+            # the cookies are taken at each download, the site may have renewed them since the previous one
+            self.__http_document_fetcher.update_session(cookies=self._driver.get_cookies(),
+                                                        user_agent=self._driver.execute_script(
+                                                            'return navigator.userAgent'),
+                                                        auth=self._get_http_auth())
+            self.__direct_downloads[file_path] = self.__http_document_fetcher.submit(url, file_path)
+        return True
+
+    def _get_http_auth(self) -> tuple[str, str] | None:
+        """ The basic authentication of the direct downloads, for the sites logged in through the URL """
+        return None
+
+    def _wait_download_complete(self, wait: Callable[[float], str], description: str, timeout: float = 60 * 3) -> str:
+        """
+            Run a wait of the download watcher with the timeout in time units, and return the path of the downloaded
+            file or raise TimeoutError. The timeout is never tuned by time.adaptive, a bigger document than the ones
+            observed so far must still have the time to come
+        """
+        try:
+            file_path: str = wait(timeout * self._timingFactor)
+        except TimeoutError:
+            raise TimeoutError('The webapp waiting too long to download {}. Please check'.format(description))
 
-            break
-        logger.info(r'Downloading {} complete'.format(file_path))
+        self._wait_while_paused()
+        return file_path
 
+    @timed_step('wait_navigating_to_other_page_complete')
     def _wait_navigating_to_other_page_complete(self, previous_url: str, expected_end_with: str = None) -> None:
         logger: Logger = get_current_logger()
-        attempt_counting: int = 0
-        max_attempt: int = 1200
-        while True:
-            current_url: str = self._driver.current_url
 
-            if attempt_counting > max_attempt:
-                raise Exception('The webapp is not navigating as expected, previous url is{}'.format(previous_url))
+        def is_navigated() -> bool:
+            current_url: str = self._driver.current_url
 
             if current_url == previous_url:
-                logger.info('Still waiting for {}\'s changing'.format(previous_url))
-                time.sleep(1 * self._timingFactor)
-                attempt_counting += 1
-                continue
+                logger.debug('Still waiting for {}\'s changing'.format(previous_url))
+                return False
 
             if expected_end_with is not None and not current_url.endswith(expected_end_with):
                 logger.warning('It has been navigated to {}'.format(current_url))
-                time.sleep(1 * self._timingFactor)
-                attempt_counting += 1
-                continue
+                return False
+
+            return True
 
-            break
+        try:
+            self._wait_until(condition=is_navigated, operation_key='navigation', timeout=1200,
+                             poll_interval=self.NAVIGATION_POLL_INTERVAL)
+        except TimeoutError:
+            raise Exception('The webapp is not navigating as expected, previous url is{}'.format(previous_url))
+        self._wait_page_ready()
 
+    @timed_step('wait_to_close_all_new_tabs_except_the_current')
     def _wait_to_close_all_new_tabs_except_the_current(self):
         current_attempt: int = 0
         max_attempt: int = 60 * 3
@@ -136,10 +654,10 @@ class WebTask(AutomatedTask, ABC):
                 raise Exception('Can not load the file')
 
             if number_of_current_tabs > 1:
-                time.sleep(1 * self._timingFactor)
+                self._sleep(1 * self._timingFactor)
                 runner: int = number_of_current_tabs
                 while runner > 1:
-                    time.sleep(1 * self._timingFactor)
+                    self._sleep(1 * self._timingFactor)
                     self._driver.switch_to.window(self._driver.window_handles[runner - 1])
                     self._driver.close()
                     runner = runner - 1
@@ -147,49 +665,180 @@ class WebTask(AutomatedTask, ABC):
                 self._driver.switch_to.window(self._driver.window_handles[0])
                 break
             else:
-                time.sleep(1 * self._timingFactor)
+                self._sleep(1 * self._timingFactor)
                 current_attempt = current_attempt + 1
 
-    def _type_when_element_present(self, by: str, value: str, content: str, time_sleep: int = 1) -> WebElement:
+    def _navigate_to(self, url: str) -> None:
+        self.__acquire_request_slot(url)
+        # with the none strategy get() returns at once, the readiness must not be the one of the previous page
+        previous_time_origin: float | None = self._driver.execute_script('return performance.timeOrigin') \
+            if self._page_load_strategy == 'none' else None
+        self._driver.get(url)
+        self.__count_browser_page()
+        self._wait_page_ready(previous_time_origin)
+
+    @timed_step('wait_page_ready')
+    def _wait_page_ready(self, previous_time_origin: float = None) -> None:
+        """
+            Wait until the page is usable: its document is no longer loading and, with browser.network_idle_ms,
+            no resource finished loading for that long. The normal page load strategy already waits for the whole
+            page, so there is nothing more to wait without browser.network_idle_ms.
+            previous_time_origin is the performance.timeOrigin of the page navigated from, to wait for a new one
+        """
+        if self._page_load_strategy == 'normal' and self._network_idle_ms <= 0:
+            return
+
+        logger: Logger = get_current_logger()
+
+        def is_page_ready() -> bool:
+            # the resources which finished loading are the ones in the resource timing buffer, enlarged so that
+            # a page loading many of them still shows the latest
+            try:
+                time_origin, ready_state, idle_ms = self._driver.execute_script("""
+                    performance.setResourceTimingBufferSize(100000);
+                    const lastResponseEnd = performance.getEntriesByType('resource')
+                        .reduce((latest, entry) => Math.max(latest, entry.responseEnd), 0);
+                    return [performance.timeOrigin, document.readyState, performance.now() - lastResponseEnd];
+                """)
+            except WebDriverException:
+                # the document is being replaced, there is no page to run the script in yet
+                return False
+            return time_origin != previous_time_origin and ready_state != 'loading' \
+                and idle_ms >= self._network_idle_ms
+
+        try:
+            self._wait_until(condition=is_page_ready, operation_key='page_ready', timeout=30,
+                             poll_interval=self.NAVIGATION_POLL_INTERVAL)
+        except TimeoutError:
+            # e.g. a page polling its server all along, it is used as it is
+            logger.warning('The page {} is still busy, continue anyway'.format(self._driver.current_url))
+
+    def _log_in(self, site_url: str, by: str, login_form_selector: str, login: Callable[[], None],
+                user: str = None) -> None:
+        """
+            Open the site with a logged in session, calling login only when there is no valid one to reuse:
+            the session of a warm browser or of the browser shared by the tabs first, then the persisted session
+            of the site and user.
+            A session is valid when the site does not show its login form. The user is the username setting
+            unless given, e.g. for another account logged in within an isolated context
+        """
+        logger: Logger = get_current_logger()
+        self._navigate_to(site_url)
+        if self._is_keeping_browser_warm and not self.__is_login_form_shown(by, login_form_selector):
+            logger.info('Reuse the logged in session of the warm browser')
+            return
+        if self.__is_in_shared_tab() and not self.__is_login_form_shown(by, login_form_selector):
+            logger.info('Reuse the logged in session of the browser shared by the tabs')
+            return
+
+        site: str = urlparse(site_url).netloc
+        if user is None:
+            user = self._settings.get('username', '')
+        if self._session_store is not None:
+            state: dict | None = self._session_store.load(site, user)
+            if state is not None:
+                self.__restore_browser_state(state)
+                self._navigate_to(site_url)
+                if not self.__is_login_form_shown(by, login_form_selector):
+                    logger.info('Restore the persisted session saved at {}'.format(state.get('saved_at')))
+                    return
+
+                logger.info('The persisted session has expired, log in again')
+                self._session_store.discard(site, user)
+                self._driver.delete_all_cookies()
+                self._navigate_to(site_url)
+
+        login()
+
+        if self._session_store is not None:
+            self._session_store.save(site, user, self.__capture_browser_state())
+
+    def __is_login_form_shown(self, by: str, login_form_selector: str) -> bool:
+        return self._try_to_get_if_element_present(by, login_form_selector,
+                                                   waiting_time=self.LOGIN_FORM_PROBE_TIME) is not None
+
+    def __capture_browser_state(self) -> dict:
+        # through CDP to get the cookies of every domain the login went through, not only the current one
+        cookies: list[dict] = self._driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        return {
+            'cookies': [{key: cookie[key]
+                         for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+                         if key in cookie and not (key == 'expires' and cookie.get('session'))}
+                        for cookie in cookies],
+            'origin': self._driver.execute_script('return window.location.origin'),
+            'local_storage': self._driver.execute_script('return Object.assign({}, window.localStorage)')
+        }
+
+    def __restore_browser_state(self, state: dict) -> None:
+        self._driver.execute_cdp_cmd('Network.setCookies', {'cookies': state.get('cookies', [])})
+        # the local storage can only be written from a page of its origin
+        if self._driver.execute_script('return window.location.origin') == state.get('origin'):
+            self._driver.execute_script('for (const [key, value] of Object.entries(arguments[0])) '
+                                        '{ window.localStorage.setItem(key, value); }',
+                                        state.get('local_storage', {}))
+
+    def __acquire_request_slot(self, url: str = None) -> None:
+        """ Wait for the turn of the host in the process-wide rate limiter, before a request to it """
+        rate_limiter: HostRateLimiter = HostRateLimiter.get_instance()
+        if not rate_limiter.has_limits:
+            return
+
+        if url is None:
+            url = self._driver.current_url
+        waited_time: float = rate_limiter.acquire(url, self.cancellation_token)
+        if waited_time > 0:
+            self._timing_recorder.record('rate_limit', waited_time)
+
+    @timed_step('type_when_element_present')
+    def _type_when_element_present(self, by: str, value: str, content: str, settle_time: float = 0) -> WebElement:
+        # typed once visible, being in the DOM is not enough to take the keys
         web_element: WebElement = self.__get_element_satisfy_predicate(by,
                                                                        value,
-                                                                       expected_conditions.presence_of_element_located(
+                                                                       self.__visibility_or_file_input_located(
                                                                            (by, value)),
-                                                                       time_sleep)
+                                                                       settle_time)
 
         web_element.send_keys(content)
         return web_element
 
-    def _click_when_element_present(self, by: str, value: str, time_sleep: int = 1) -> WebElement:
+    @timed_step('click_when_element_present')
+    def _click_when_element_present(self, by: str, value: str, settle_time: float = 0) -> WebElement:
+        # clicked once visible and enabled, being in the DOM is not enough to take the click
         web_element: WebElement = self.__get_element_satisfy_predicate(by,
                                                                        value,
-                                                                       expected_conditions.presence_of_element_located(
+                                                                       expected_conditions.element_to_be_clickable(
                                                                            (by, value)),
-                                                                       time_sleep)
+                                                                       settle_time)
 
+        self.__acquire_request_slot()
         web_element.click()
         return web_element
 
-    def _click_and_wait_navigate_to_other_page(self, by: str, value: str, time_sleep: int = 1) -> WebElement:
+    @timed_step('click_and_wait_navigate_to_other_page')
+    def _click_and_wait_navigate_to_other_page(self, by: str, value: str, settle_time: float = 0) -> WebElement:
         previous_url: str = self._driver.current_url
         web_element: WebElement = self.__get_element_satisfy_predicate(by,
                                                                        value,
-                                                                       expected_conditions.presence_of_element_located(
+                                                                       expected_conditions.element_to_be_clickable(
                                                                            (by, value)),
-                                                                       time_sleep)
+                                                                       settle_time)
+        self.__acquire_request_slot(previous_url)
         web_element.click()
         self._wait_navigating_to_other_page_complete(previous_url=previous_url)
+        self.__count_browser_page()
         return web_element
 
-    def _get_when_element_present(self, by: str, value: str, time_sleep: int = 1) -> WebElement:
+    @timed_step('get_when_element_present')
+    def _get_when_element_present(self, by: str, value: str, settle_time: float = 0) -> WebElement:
         web_element: WebElement = self.__get_element_satisfy_predicate(by,
                                                                        value,
                                                                        expected_conditions.presence_of_element_located(
                                                                            (by, value)),
-                                                                       time_sleep)
+                                                                       settle_time)
         return web_element
 
-    def _try_to_get_if_element_present(self, by: str, value: str, time_sleep: int = 1, waiting_time: int = 30
+    @timed_step('try_to_get_if_element_present')
+    def _try_to_get_if_element_present(self, by: str, value: str, settle_time: float = 0, waiting_time: int = 30
                                        ) -> WebElement:
 
         try:
@@ -197,46 +846,116 @@ class WebTask(AutomatedTask, ABC):
                                                                            value,
                                                                            expected_conditions.presence_of_element_located(
                                                                                (by, value)),
-                                                                           time_sleep,
+                                                                           settle_time,
                                                                            waiting_time)
 
             return web_element
         except TimeoutException:
             return None
 
+    @staticmethod
+    def __visibility_or_file_input_located(locator: tuple[str, str]) -> Callable[[AnyDriver], WebElement | bool]:
+        """
+            Like visibility_of_element_located, but a file input, usually hidden behind a styled button, is typed in
+            as soon as it is present
+        """
+
+        def get_element_if_typeable(driver: AnyDriver) -> WebElement | bool:
+            web_element: WebElement = driver.find_element(*locator)
+            if web_element.get_attribute('type') == 'file' or web_element.is_displayed():
+                return web_element
+            return False
+
+        return get_element_if_typeable
+
     def __get_element_satisfy_predicate(self,
                                         by: str,
                                         element_selector: str,
                                         method: Callable[[AnyDriver], WebElement],
-                                        first_time_sleep: int = 1,
+                                        settle_time: float = 0,
                                         waiting_time: int = 30) -> WebElement:
-        time.sleep(first_time_sleep * self._timingFactor)
-        if self.use_gui:
-            WebDriverWait(self._driver, waiting_time * self._timingFactor).until(method)
-        queried_element: WebElement = self._driver.find_element(by=by, value=element_selector)
-        return queried_element
+        """
+            Poll the condition at a short interval until it gives the element, in both GUI and headless mode.
+            The settle time is the minimum time to wait even if the element is already there, only for the pages
+            which need a moment after the element appears (e.g. an animation), it is in time units like waiting_time
+        """
+        start_time: float = time.monotonic()
+
+        def get_element_if_satisfied() -> WebElement | None:
+            try:
+                return method(self._driver)
+            except (NoSuchElementException, StaleElementReferenceException):
+                return None
+
+        try:
+            web_element: WebElement = self._wait_until(condition=get_element_if_satisfied,
+                                                       operation_key='element {}={}'.format(by, element_selector),
+                                                       timeout=waiting_time,
+                                                       poll_interval=self.ELEMENT_POLL_INTERVAL)
+        except TimeoutError as exception:
+            raise TimeoutException(str(exception))
+
+        remaining_settle_time: float = settle_time * self._timingFactor - (time.monotonic() - start_time)
+        if remaining_settle_time > 0:
+            self._sleep(remaining_settle_time)
+        return web_element
 
+    @timed_step('extract_rows')
+    def _extract_rows(self, rows_selector: str, column_selectors: dict[str, str], attribute: str = 'innerText'
+                      ) -> list[dict[str, str | int | None]]:
+        """
+            Read a table of the page in a single round trip to the browser instead of one per cell: for each element
+            matching the CSS rows_selector, the attribute (or property, like get_attribute) of the first element
+            matching each relative CSS selector of column_selectors, '' for the row itself, None when absent.
+            Each row also has its position among its siblings under 'nth_child', to target it with :nth-child()
+        """
+        return self._driver.execute_script("""
+            const [rowsSelector, columnSelectors, attribute] = arguments;
+            return Array.from(document.querySelectorAll(rowsSelector), (row) => {
+                const values = {nth_child: Array.prototype.indexOf.call(row.parentElement.children, row) + 1};
+                for (const [column, selector] of Object.entries(columnSelectors)) {
+                    const cell = selector === '' ? row : row.querySelector(selector);
+                    values[column] = cell === null ? null
+                        : (cell[attribute] !== undefined ? cell[attribute] : cell.getAttribute(attribute));
+                }
+                return values;
+            });
+        """, rows_selector, column_selectors, attribute)
+
+    @timed_step('find_matched_option')
     def find_matched_option(self, by: str, list_options_selector: str, search_keyword: str) -> WebElement:
-        options: list[WebElement] = self._driver.find_elements(by=by, value=list_options_selector)
-        finding_option = None
-        for current_option in options:
-            current_inner_text = current_option.get_attribute('innerText')
-            if current_inner_text == search_keyword:
-                finding_option = current_option
-                break
-        if finding_option is None:
-            raise Exception('Can not find out the option whose inner text match your search keyword')
-        return finding_option
+        return self.__find_option_by_inner_text(by, list_options_selector, search_keyword)
 
+    @timed_step('find_matched_option_shadow')
     def find_matched_option_shadow(self, by: str, list_options_selector: str,
                                    search_keyword: str) -> WebElement:
-        options: list[WebElement] = self._driver.find_elements(by=by, value=list_options_selector)
-        finding_option = None
-        for current_option in options:
-            current_inner_text = current_option.get_attribute('innerText')
-            if current_inner_text == search_keyword:
-                finding_option = current_option
-                break
+        return self.__find_option_by_inner_text(by, list_options_selector, search_keyword)
+
+    def __find_option_by_inner_text(self, by: str, list_options_selector: str, search_keyword: str) -> WebElement:
+        # the options are compared in the browser, rather than reading their inner text one round trip at a time
+        if by == By.CSS_SELECTOR:
+            finding_option: WebElement | None = self._driver.execute_script("""
+                const [selector, keyword] = arguments;
+                return Array.from(document.querySelectorAll(selector)).find((option) => option.innerText === keyword)
+                    || null;
+            """, list_options_selector, search_keyword)
+        elif by == By.XPATH:
+            finding_option: WebElement | None = self._driver.execute_script("""
+                const [selector, keyword] = arguments;
+                const options = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,
+                                                  null);
+                for (let index = 0; index < options.snapshotLength; index++) {
+                    if (options.snapshotItem(index).innerText === keyword) {
+                        return options.snapshotItem(index);
+                    }
+                }
+                return null;
+            """, list_options_selector, search_keyword)
+        else:
+            finding_option: WebElement | None = next(
+                (option for option in self._driver.find_elements(by=by, value=list_options_selector)
+                 if option.get_attribute('innerText') == search_keyword), None)
+
         if finding_option is None:
             raise Exception('Can not find out the option whose inner text match your search keyword')
         return finding_option
@@ -14,6 +14,7 @@ from src.task.AutomatedTask import AutomatedTask
 
 # noinspection PyPackageRequirements
 class PDFCombine_KH(AutomatedTask):
+    cpu_bound: bool = True
     tax_to_bill: dict[str, str] = {}
 
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
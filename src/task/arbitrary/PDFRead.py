@@ -12,6 +12,8 @@ from src.task.AutomatedTask import AutomatedTask
 
 
 class PDFRead(AutomatedTask):
+    cpu_bound: bool = True
+
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
         super().__init__(settings, callback_before_run_task)
 
@@ -55,9 +55,15 @@ class GCSS_Automate(DesktopTask):
 
         self.current_element_count = 0
         self.total_element_size = len(shipments)
+        self._open_checkpoint_journal(shipments)
 
         for i, shipment in enumerate(shipments):
 
+            if self._is_element_checkpointed(shipment):
+                self.current_status_excel_row_index += 1
+                self.current_element_count += 1
+                continue
+
             if self.terminated is True:
                 return
 
@@ -77,6 +83,7 @@ class GCSS_Automate(DesktopTask):
                     logger.info(f"Skipping shipment {shipment} due to status: {status_address[i]}")
                     self.input_status_into_excel('Skip')
                     self.excel_provider.save(workbook)
+                    self._checkpoint_element(shipment)
                     self.current_status_excel_row_index += 1
                     self.current_element_count += 1
                     continue
@@ -98,10 +105,12 @@ class GCSS_Automate(DesktopTask):
                 self.excel_provider.save(workbook)
                 logger.info(f'Cannot handle shipment {shipment}. Moving to next shipment')
                 self._close_windows_util_reach_first_gscc()
+                self._checkpoint_element(shipment)
                 self.current_status_excel_row_index += 1
                 self.current_element_count += 1
                 continue
 
+            self._checkpoint_element(shipment)
             self.current_status_excel_row_index += 1
             self.current_element_count += 1
 
@@ -1,4 +1,3 @@
-import time
 from logging import Logger
 from typing import Callable
 
@@ -17,7 +16,7 @@ class ExampleTask(WebTask):
         return mandatory_keys
 
     def automate(self):
-        self._driver.get("https://nxbkimdong.com.vn/")
+        self._navigate_to("https://nxbkimdong.com.vn/")
         booking_ids = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
         self.perform_mainloop_on_collection(booking_ids, self.operation_on_each_element)
 
@@ -27,4 +26,4 @@ class ExampleTask(WebTask):
         logger.info(self.settings.get('huy.path'))
 
         logger.info("Example automated task - running at booking {}".format(booking))
-        time.sleep(2)
+        self._sleep(2)
@@ -1,14 +1,12 @@
 import os
-import threading
-import time
 from datetime import datetime, timedelta
 from logging import Logger
 from typing import Callable
 
 from selenium.webdriver.common.by import By
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row, extract_zip, \
-    check_parent_folder_contain_all_required_sub_folders, remove_all_in_folder
+from src.common.FileUtil import extract_zip, check_parent_folder_contain_all_required_sub_folders, remove_all_in_folder
+from src.common.StagePipeline import PipelineStage
 from src.common.StringUtil import join_set_of_elements
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.WebTask import WebTask
@@ -24,6 +22,9 @@ class Download_Blx(WebTask):
                                      'excel.column.bill']
         return mandatory_keys
 
+    def _input_column_settings(self) -> list[str]:
+        return ['excel.column.bill']
+
     def automate(self) -> None:
 
         logger: Logger = get_current_logger()
@@ -31,23 +32,23 @@ class Download_Blx(WebTask):
             "---------------------------------------------------------------------------------------------------------")
         logger.info("Start processing")
 
-        self._driver.get('https://apll.get-traction.com/')
-
         logger.info('Try to login')
-        self.__login()
+        self._log_in(site_url='https://apll.get-traction.com/',
+                     by=By.ID, login_form_selector='username', login=self.__login)
         logger.info("Login successfully")
 
-        bills: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                 self._settings['excel.sheet'],
-                                                                 self._settings['excel.column.bill'])
+        bills: list[str] = self._get_input_column('excel.column.bill')
 
         if len(bills) == 0:
             logger.error('Input booking id list is empty ! Please check again')
 
-        last_bill: str = ''
-        self.perform_mainloop_on_collection(bills, self.operation_on_each_element)
+        self.perform_pipeline_on_collection(bills, [
+            PipelineStage(name='Navigate and click download', operation=self.operation_on_each_element),
+            PipelineStage(name='Wait for download complete', operation=self.__wait_download_complete),
+            PipelineStage(name='Extract zip', operation=self.__extract_downloaded_zip)
+        ])
 
-        self._driver.close()
+        self._close_browser()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -60,6 +61,10 @@ class Download_Blx(WebTask):
         # Pause and wait for the user to press Enter
         logger.info("It ends at {}. Press any key to end program...".format(datetime.now()))
 
+    def _prepare_worker_driver(self) -> None:
+        self._log_in(site_url='https://apll.get-traction.com/',
+                     by=By.ID, login_form_selector='username', login=self.__login)
+
     def __login(self) -> None:
         username: str = self._settings['username']
         password: str = self._settings['password']
@@ -68,7 +73,7 @@ class Download_Blx(WebTask):
         self._type_when_element_present(by=By.ID, value='password', content=password)
         self._click_and_wait_navigate_to_other_page(by=By.CSS_SELECTOR, value='input[type=button]')
 
-    def operation_on_each_element(self, bill):
+    def operation_on_each_element(self, bill) -> str | None:
         logger: Logger = get_current_logger()
 
         if self.terminated is True:
@@ -83,12 +88,11 @@ class Download_Blx(WebTask):
                 return
 
         logger.info("Processing booking : " + bill)
-        self.__navigate_and_download(bill)
-        last_bill = bill
+        return self.__navigate_and_download(bill)
 
     def __check_up_all_downloads(self, booking_ids: set[str]) -> None:
         logger: Logger = get_current_logger()
-        time.sleep(10 * self._timingFactor)
+        self._sleep(10 * self._timingFactor)
         is_all_contained, successful_bills, unsuccessful_bills = check_parent_folder_contain_all_required_sub_folders(
             parent_folder=self._download_folder, required_sub_folders=booking_ids)
 
@@ -103,32 +107,37 @@ class Download_Blx(WebTask):
             successful_bills = join_set_of_elements(unsuccessful_bills, " ")
             logger.info(successful_bills)
 
-    def __navigate_and_download(self, bill: str) -> None:
+    def __navigate_and_download(self, bill: str) -> str:
         logger: Logger = get_current_logger()
         self._type_when_element_present(by=By.CSS_SELECTOR, value='div.fm.fm-html input[type=text]', content=bill)
         # click find button
         self._click_when_element_present(by=By.CSS_SELECTOR, value='button.gwt-Button')
 
-        # click download
-        try:
-            self._click_when_element_present(by=By.LINK_TEXT, value='{}_REVISED.zip'.format(bill))
-            full_file_path: str = os.path.join(self._download_folder, "{}_REVISED.zip".format(bill))
-        except:
-            self._click_when_element_present(by=By.LINK_TEXT, value='{}.zip'.format(bill))
+        # click download, the revised zip if the bill has one, a single wait for the results shows either link
+        revised_file_name: str = '{}_REVISED.zip'.format(bill)
+        file_name: str = '{}.zip'.format(bill)
+        self._get_when_element_present(by=By.XPATH,
+                                       value="//a[normalize-space(.)='{}' or normalize-space(.)='{}']"
+                                       .format(revised_file_name, file_name))
+        if self._try_to_get_if_element_present(by=By.LINK_TEXT, value=revised_file_name, waiting_time=0) is not None:
+            file_name = revised_file_name
+        else:
             logger.info('get bill not revised')
-            full_file_path: str = os.path.join(self._download_folder, bill + '.zip')
 
-        self._wait_download_file_complete(full_file_path)
-        extract_zip_task = threading.Thread(target=extract_zip,
-                                            args=(full_file_path, self._download_folder,
-                                                  self.delete_redundant_opening_pdf_files,
-                                                  None),
-                                            daemon=False)
-        extract_zip_task.start()
-
-        # click to back to the overview Booking page
-        self._driver.get('https://apll.get-traction.com/')
+        full_file_path: str = os.path.join(self._download_folder, file_name)
+        self._download_from_link(by=By.LINK_TEXT, value=file_name, file_path=full_file_path)
+
+        # click to back to the overview Booking page, the started download keeps landing in the meantime
+        self._navigate_to('https://apll.get-traction.com/')
         logger.info("Navigating back to overview Booking page")
+        return full_file_path
+
+    def __wait_download_complete(self, full_file_path: str) -> str:
+        self._wait_download_file_complete(full_file_path)
+        return full_file_path
+
+    def __extract_downloaded_zip(self, full_file_path: str) -> None:
+        extract_zip(full_file_path, self._download_folder, self.delete_redundant_opening_pdf_files, None)
 
     @staticmethod
     def delete_redundant_opening_pdf_files(download_folder: str) -> None:
@@ -1,6 +1,4 @@
 import os
-import threading
-import time
 from datetime import datetime, timedelta
 from enum import Enum
 from logging import Logger
@@ -9,9 +7,9 @@ from typing import Callable
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row, extract_zip, \
-    remove_all_in_folder
+from src.common.FileUtil import extract_zip, remove_all_in_folder
 from src.common.ResourceLock import ResourceLock
+from src.common.StagePipeline import PipelineStage
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.WebTask import WebTask
 
@@ -34,38 +32,23 @@ class Download_CottonOn(WebTask):
                                      'excel.column.so', 'excel.column.becode']
         return mandatory_keys
 
+    def _input_column_settings(self) -> list[str]:
+        return ['excel.column.booking', 'excel.column.becode', 'excel.column.so']
+
     def automate(self) -> None:
         logger: Logger = get_current_logger()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("Start processing")
 
-        self._driver.get('https://app.shipeezi.com/')
-
         logger.info('Try to login')
-        self.__login()
-        logger.info("Login successfully")
-
-        logger.info("Navigate to overview Booking page the first time")
-        # click navigating operations on header
-        time.sleep(1)
-        self._click_when_element_present(by=By.CSS_SELECTOR, value='div[data-cy=nav-Operations]')
-        # click navigating overview bookings page - on the header
-        self._click_and_wait_navigate_to_other_page(by=By.CSS_SELECTOR, value='li[data-cy=bookings]')
+        self.__open_overview_bookings()
 
-        booking_ids: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                       self._settings['excel.sheet'],
-                                                                       self._settings[
-                                                                           'excel.column.booking'])
+        booking_ids: list[str] = self._get_input_column('excel.column.booking')
 
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
+        becodes: list[str] = self._get_input_column('excel.column.becode')
 
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
+        so_numbers: list[str] = self._get_input_column('excel.column.so')
         if len(booking_ids) == 0:
             logger.error('Input booking id list is empty ! Please check again')
 
@@ -78,25 +61,16 @@ class Download_CottonOn(WebTask):
             self.booking_to_info[booking] = (so_numbers[index], becodes[index])
             index += 1
 
-        last_booking: str = ''
-        for booking in booking_ids:
-
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
+        self.perform_pipeline_on_collection(booking_ids, [
+            PipelineStage(name='Navigate and click download', operation=self.__process_booking),
+            PipelineStage(name='Wait for download complete', operation=self.__wait_download_complete),
+            PipelineStage(name='Extract zip and rename', operation=self.__extract_downloaded_zip)
+        ])
 
-                while self.paused:
-                    self.pause_condition.wait()
+        if self.terminated is True:
+            return
 
-                if self.terminated is True:
-                    return
-
-            logger.info("Processing booking : " + booking)
-            self.__navigate_and_download(booking)
-            last_booking = booking
-
-        self._driver.close()
+        self._close_browser()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -109,46 +83,58 @@ class Download_CottonOn(WebTask):
         # Pause and wait for the user to press Enter
         logger.info("It ends at {}. Press any key to end program...".format(datetime.now()))
 
+    def _prepare_worker_driver(self) -> None:
+        self.__open_overview_bookings()
+
+    def __open_overview_bookings(self) -> None:
+        logger: Logger = get_current_logger()
+        self._log_in(site_url='https://app.shipeezi.com/',
+                     by=By.ID, login_form_selector='user-mail', login=self.__login)
+        logger.info("Login successfully")
+
+        logger.info("Navigate to overview Booking page the first time")
+        # click navigating operations on header
+        self._sleep(1)
+        self._click_when_element_present(by=By.CSS_SELECTOR, value='div[data-cy=nav-Operations]')
+        # click navigating overview bookings page - on the header
+        self._click_and_wait_navigate_to_other_page(by=By.CSS_SELECTOR, value='li[data-cy=bookings]')
+
     def __login(self) -> None:
         username: str = self._settings['username']
         password: str = self._settings['password']
 
         self._type_when_element_present(by=By.ID, value='user-mail', content=username)
         self._type_when_element_present(by=By.ID, value='pwd', content=password)
-        time.sleep(2)
+        self._sleep(2)
         self._click_and_wait_navigate_to_other_page(by=By.CSS_SELECTOR, value='button[type=submit]')
 
-    def __navigate_and_download(self, booking: str) -> None:
+    def __process_booking(self, booking: str) -> str:
+        logger: Logger = get_current_logger()
+        logger.info("Processing booking : " + booking)
+        return self.__navigate_and_download(booking)
+
+    def __navigate_and_download(self, booking: str) -> str:
         logger: Logger = get_current_logger()
         search_box: WebElement = self._type_when_element_present(by=By.CSS_SELECTOR,
                                                                  value='div[data-cy=search] input',
                                                                  content=booking)
 
         # try to click option_booking - which usually out of focus and be removed from the DOM / cause exception
-        try_attempt_count: int = 0
-        while True:
-            try:
-                if try_attempt_count > 20:
-                    raise Exception('Look like we have problems with the web structure changed - '
-                                    'we could not click on the option_booking ! Need to our investigation')
-
-                time.sleep(1 * self._timingFactor)
-                self._driver.find_element(by=By.CSS_SELECTOR, value='.MuiAutocomplete-option:nth-child(1)').click()
-                logger.info('Clicked option_booking for {} successfully'.format(booking))
-                break
-            except Exception as exception:
-                logger.error(str(exception))
-
-                time.sleep(1 * self._timingFactor)
-                self._driver.execute_script("arguments[0].value = '{}';".format(booking), search_box)
-
-                time.sleep(1 * self._timingFactor)
-                search_box.click()
-
-                logger.info('The {}th sent new key and click to try revoke the autocomplete board show up '
-                            'option_booking for {}'.format(try_attempt_count, booking))
-                try_attempt_count += 1
-                continue
+        def click_first_option_booking() -> None:
+            self._driver.find_element(by=By.CSS_SELECTOR, value='.MuiAutocomplete-option:nth-child(1)').click()
+            logger.info('Clicked option_booking for {} successfully'.format(booking))
+
+        def revoke_autocomplete_board(attempt: int, exception: Exception) -> None:
+            logger.error(str(exception))
+            self._driver.execute_script("arguments[0].value = '{}';".format(booking), search_box)
+            search_box.click()
+            logger.info('The {}th sent new key and click to try revoke the autocomplete board show up '
+                        'option_booking for {}'.format(attempt, booking))
+
+        self._create_retry_policy(max_attempts=21, initial_delay=0.5, max_delay=4.0).execute(
+            click_first_option_booking,
+            on_retry=revoke_autocomplete_board,
+            description='Clicking option_booking for {}'.format(booking))
 
         # click detail booking
         self._click_when_element_present(by=By.CSS_SELECTOR, value='td[data-cy=table-cell-actions] '
@@ -157,26 +143,30 @@ class Download_CottonOn(WebTask):
         self._click_when_element_present(by=By.ID, value='item-documents')
 
         # wait until the progress bar on view file disappear
-        time.sleep(1 * self._timingFactor)
+        self._sleep(1 * self._timingFactor)
 
-        # click downLoad all files
-        self._click_when_element_present(by=By.CSS_SELECTOR, value='div[data-cy=shipment-documents-box] '
-                                                                   'div:nth-child(2) button')
+        # click downLoad all files, the button has no link, the page must stay until the browser starts the download
+        with self._expecting_download_start():
+            self._click_when_element_present(by=By.CSS_SELECTOR, value='div[data-cy=shipment-documents-box] '
+                                                                       'div:nth-child(2) button')
 
         full_file_path: str = os.path.join(self._download_folder, booking + '.zip')
-        self._wait_download_file_complete(full_file_path)
-        extract_zip_task = threading.Thread(target=extract_zip,
-                                            args=(full_file_path, self._download_folder,
-                                                  self.delete_redundant_opening_pdf_files,
-                                                  self.rename_all_files_in_folder_extracted),
-                                            daemon=False)
-
-        extract_zip_task.start()
-        # click to back to the overview Booking page
+
+        # click to back to the overview Booking page, the started download keeps landing in the meantime
         self._click_when_element_present(by=By.CSS_SELECTOR, value='button[data-cy=iconButtonClose] '
                                                                    'span.MuiIconButton-label svg')
         self._click_when_element_present(by=By.CSS_SELECTOR, value='div[role=button] svg')
         logger.info("Navigating back to overview Booking page")
+        return full_file_path
+
+    def __wait_download_complete(self, full_file_path: str) -> str:
+        self._wait_download_file_complete(full_file_path)
+        return full_file_path
+
+    def __extract_downloaded_zip(self, full_file_path: str) -> None:
+        extract_zip(full_file_path, self._download_folder,
+                    self.delete_redundant_opening_pdf_files,
+                    self.rename_all_files_in_folder_extracted)
 
     @staticmethod
     def delete_redundant_opening_pdf_files(download_folder: str) -> None:
@@ -1,18 +1,15 @@
 import datetime
 import os
 import shutil
-import time
 from datetime import datetime
 from enum import Enum
 from logging import Logger
 from typing import Dict, Tuple, Callable
 
-import requests
 from openpyxl import load_workbook
 from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.CancellationToken import OperationCancelledException
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.WebTask import WebTask
 
@@ -35,6 +32,9 @@ class Duty(WebTask):
                                      'excel.column.fcr', 'excel.column.fcr_rename']
         return mandatory_keys
 
+    def _input_column_settings(self) -> list[str]:
+        return ['excel.column.fcr']
+
     def automate(self):
         logger: Logger = get_current_logger()
         logger.info(
@@ -46,13 +46,13 @@ class Duty(WebTask):
         login_url = ('https://{}:{}@amerapps-legacy.apmoller.net/DutyDeduction/Grid.aspx?search=true'
                      .format((uid), (psw)))
         logger.info('Try to login')
-        self._driver.get(login_url)
+        self._navigate_to(login_url)
         logger.info("Login successfully")
 
-        fcr_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                       self._settings['excel.sheet'],
-                                                                       self._settings[
-                                                                           'excel.column.fcr'])
+        fcr_numbers: list[str] = self._get_input_column('excel.column.fcr')
+
+        self._open_checkpoint_journal(fcr_numbers)
+        fcr_numbers = [fcr for fcr in fcr_numbers if not self._is_element_checkpointed(fcr)]
 
         needed_to_add_cookies = Duty.produce_needed_to_add_cookie_contents(batch_size=20, fcr_numbers=fcr_numbers)
         download_filter_cookies: list[str] = needed_to_add_cookies[0]
@@ -70,27 +70,26 @@ class Duty(WebTask):
                     {'name': 'Download1FilterString', 'value': f'{download_filter_cookies[batch_index]}'})
                 self._driver.add_cookie(
                     {'name': 'SearchControl1Download1Filter', 'value': f'{search_filter_cookies[batch_index]}'})
-                self._driver.get(login_url)
+                self._navigate_to(login_url)
                 logger.info('Refreshed cookies')
-                time.sleep(1)
+                self._sleep(1)
 
             except:
                 logger.info('cannot add cookies')
 
             fcr_code_to_index_and_time: Dict[str, Tuple[int, datetime]] = {}
 
-            fcr_elements: list[WebElement] = self._driver.find_elements(by=By.CSS_SELECTOR,
-                                                                        value='table#EDIGrid.MyGrid tr td:nth-child(6) span')
-            fcr_elements = fcr_elements[1:]
+            # the whole grid in a single round trip, the first row with these cells is its header
+            grid_rows: list[dict] = self._extract_rows(rows_selector='table#EDIGrid.MyGrid tr',
+                                                       column_selectors={'fcr': 'td:nth-child(6) span',
+                                                                         'date': 'td:nth-child(8) span'})
+            grid_rows = [grid_row for grid_row in grid_rows if grid_row['fcr'] is not None][1:]
 
-            fcr_index = 2
-            for fcr_element in fcr_elements:
+            for grid_row in grid_rows:
 
-                fcr_code: str = fcr_element.get_attribute('innerText')
-                date_element = self._driver.find_element(by=By.CSS_SELECTOR,
-                                                         value=f'table#EDIGrid.MyGrid tr:nth-child({fcr_index}) '
-                                                               f'td:nth-child(8) span')
-                date_string = date_element.get_attribute('innerText')
+                fcr_code: str = grid_row['fcr']
+                fcr_index: int = grid_row['nth_child']
+                date_string = grid_row['date']
                 date_format = "%m/%d/%Y %I:%M:%S %p"
                 fcr_datetime = datetime.strptime(date_string, date_format)
 
@@ -101,42 +100,59 @@ class Duty(WebTask):
                     if fcr_datetime >= last_fcr_datetime:
                         fcr_code_to_index_and_time[fcr_code] = (fcr_index, fcr_datetime)
 
-                fcr_index += 1
-
+            fcr_to_fetching_document_path: dict[str, str] = {}
             for key, value in fcr_code_to_index_and_time.items():
                 fcr_code = key
                 fcr_index = value[0]
-                self.click_download(fcr_code, fcr_index)
-
-                self._rename_file_after_download(fcr_code, fcr_index)
+                if self._is_element_checkpointed(fcr_code):
+                    continue
+
+                document_path: str = os.path.join(self._settings['rename.folder'], '{}_Duty.pdf'.format(fcr_code))
+                if self.click_download(fcr_code, fcr_index, document_path):
+                    # fetched in the background, the whole batch is waited at once
+                    fcr_to_fetching_document_path[fcr_code] = document_path
+                    continue
+
+                if self._rename_file_after_download(fcr_code, fcr_index):
+                    self._checkpoint_element(fcr_code)
+
+            for fcr_code, document_path in fcr_to_fetching_document_path.items():
+                try:
+                    self._wait_download_file_complete(document_path)
+                except OperationCancelledException:
+                    raise
+                except Exception as exception:
+                    logger.error('Can not fetch the document for {}: {}'.format(fcr_code, exception))
+                    continue
+                self._checkpoint_element(fcr_code)
 
             batch_index += 1
 
         logger.info("Complete download")
         self._input_excel()
         logger.info('Checked file exist - Check your file Excel to get infor')
-        self._driver.close()
+        self._close_browser()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
 
-    def click_download(self, fcr_code: str, fcr_index: int):
+    def click_download(self, fcr_code: str, fcr_index: int, document_path: str) -> bool:
+        """ Return True when the document is fetched directly into document_path rather than clicked """
         logger: Logger = get_current_logger()
-        max_attempt = 5
-        attempt_counter = 0
-        while True:
-            try:
-                if attempt_counter >= max_attempt:
-                    raise Exception('Can not click download for fcr {}'.format(fcr_code))
 
-                logger.info(f'Try to click on {fcr_code} at index {fcr_index}')
-                self._click_when_element_present(by=By.CSS_SELECTOR,
-                                                 value=f'table#EDIGrid.MyGrid tr:nth-child({fcr_index}) a')
+        def click_download_link() -> bool:
+            logger.info(f'Try to click on {fcr_code} at index {fcr_index}')
+            return self._download_from_link(by=By.CSS_SELECTOR,
+                                            value=f'table#EDIGrid.MyGrid tr:nth-child({fcr_index}) a',
+                                            file_path=document_path)
+
+        return self._create_retry_policy(max_attempts=5).execute(click_download_link,
+                                                                 description='Click download for fcr {}'
+                                                                 .format(fcr_code))
 
-                break
-            except Exception:
-                time.sleep(1)
-                attempt_counter += 1
+    def _get_http_auth(self) -> tuple[str, str] | None:
+        # the portal is logged in through the basic authentication of its URL
+        return self._settings['username'], self._settings['password']
 
     @staticmethod
     def produce_needed_to_add_cookie_contents(batch_size: int = 20, fcr_numbers: list[str] = None) -> tuple[
@@ -177,64 +193,31 @@ class Duty(WebTask):
 
         return download_filter_cookies, search_filter_cookies
 
-    def _rename_file_after_download(self, fcr_code: str, fcr_index: int):
+    def _rename_file_after_download(self, fcr_code: str, fcr_index: int) -> bool:
+        """ Return whether the document has been downloaded and moved into the rename folder """
         logger: Logger = get_current_logger()
 
-        download_folder: str = self._settings['download.folder']
         rename_folder: str = self._settings['rename.folder']
 
-        attempt_counter: int = 0
-        max_attempt: int = 2 * 60
-        while True:
+        try:
+            full_file_path: str = self._wait_download_complete(
+                lambda timeout: self._download_watcher.wait_for_any_file('.pdf', timeout, self.cancellation_token),
+                description='the document for {}'.format(fcr_code),
+                timeout=2 * 60)
+        except TimeoutError as exception:
+            logger.error('{} !'.format(exception))
+            return False
 
-            if attempt_counter > max_attempt:
-                logger.error('The tool waiting too long to download document for {}. Please check !'.format(fcr_code))
-                break
+        # The download has completed
+        logger.info('The document for {} has been downloaded !'.format(fcr_code))
 
-            all_files_in_download_folder: list[str] = os.listdir(download_folder)
-            download_filename: str = None if len(all_files_in_download_folder) == 0 else all_files_in_download_folder[0]
-
-            if download_filename is None or not download_filename.endswith('.pdf'):
-                time.sleep(1)
-                attempt_counter += 1
-                continue
-
-            # The download has completed
-            logger.info('The document for {} has been downloaded !'.format(fcr_code))
-            break
-
-        all_files_in_download_folder: list[str] = os.listdir(download_folder)
-        download_filename: str = None if len(all_files_in_download_folder) == 0 else all_files_in_download_folder[0]
-
-        full_file_path: str = os.path.join(download_folder, download_filename)
         rename_filename_path = os.path.join(rename_folder, '{}_Duty.pdf'.format(fcr_code))
-
         if os.path.exists(rename_filename_path):
             os.remove(rename_filename_path)
 
-        max_attempt: int = 2 * 60
-        while True:
-            if attempt_counter > max_attempt:
-                logger.error('The tool waiting too long to download document for {}. Please check !'.format(fcr_code))
-                break
-
-            if os.path.getsize(full_file_path) > 0:
-                shutil.copy(full_file_path, rename_filename_path)
-                time.sleep(1)
-            else:
-                os.remove(full_file_path)
-                logger.info('Removed file {}'.format(full_file_path))
-
-            if os.path.exists(rename_filename_path) and os.path.getsize(rename_filename_path) > 0:
-                logger.info('Renamed from {} to {}'.format(full_file_path, rename_filename_path))
-                os.remove(full_file_path)
-                break
-            else:
-                logger.info('File {} emty, try to moving'.format(rename_filename_path))
-                time.sleep(1)
-                shutil.copy(full_file_path, rename_filename_path)
-                attempt_counter += 1
-                continue
+        shutil.move(full_file_path, rename_filename_path)
+        logger.info('Renamed from {} to {}'.format(full_file_path, rename_filename_path))
+        return True
 
     def _input_excel(self):
         logger: Logger = get_current_logger()
@@ -262,37 +245,3 @@ class Duty(WebTask):
             if os.path.exists(new_file_path):
                 os.remove(new_file_path)
             wb.save(new_file_path)
-
-    # _______________________________________________________________________________________________________________
-    def _rename_by_asp(self, postfix_url: str):
-
-        cookie_asp_session = self._driver.get_cookie('ASP.NET_SessionId')
-        if cookie_asp_session:
-            asp_session_value = cookie_asp_session.get('value')
-
-            if asp_session_value:
-                pdf_url = postfix_url
-                cookies = self._driver.get_cookies()
-
-                session = requests.Session()
-
-                cookies_string = ';'.join([f"{cookie['name']}={cookie['value']}" for cookie in cookies])
-                headers = {'Cookie': f"NET_SessionId={asp_session_value}",
-                           'Host': 'amerapps.apmoller.net'}
-
-                session.auth = None
-                response = session.get(pdf_url, headers=headers, verify=False, auth=None)
-
-                if response.status_code == 200:
-                    # Lưu phản hồi từ yêu cầu requests dưới dạng tệp PDF
-                    download_path = '/path/to/save/downloaded_file.pdf'  # Thay thế bằng đường dẫn lưu tệp PDF
-                    with open(download_path, 'wb') as file:
-                        file.write(response.content)
-                    print(f"Download successful. File saved at: {download_path}")
-                else:
-                    print("Download failed.")
-            else:
-                print("ASPSession cookie value not found.")
-        else:
-            print("ASPSession cookie not found.")
-    # ________________________________________________________________________________________________________________
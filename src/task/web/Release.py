@@ -1,4 +1,3 @@
-import time
 from logging import Logger
 from typing import Callable
 
@@ -6,7 +5,6 @@ from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.WebTask import WebTask
 
@@ -27,14 +25,17 @@ class Release(WebTask):
                                      'excel.column.so', 'excel.column.becode']
         return mandatory_keys
 
+    def _input_column_settings(self) -> list[str]:
+        return ['excel.column.becode', 'excel.column.so']
+
     def automate(self):
         logger: Logger = get_current_logger()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("Start processing")
-        self._driver.get('https://portal.damco.com/Applications/documentmanagement/')
         logger.info('Try to login')
-        self.__login()
+        self._log_in(site_url='https://portal.damco.com/Applications/documentmanagement/',
+                     by=By.ID, login_form_selector='ctl00_ContentPlaceHolder1_UsernameTextBox', login=self.__login)
         logger.info("Login successfully")
         logger.info("Navigate to refresh page the first time")
 
@@ -43,45 +44,36 @@ class Release(WebTask):
             if current_url.endswith('documentmanagement/'):
                 break
             self._click_when_element_present(by=By.CSS_SELECTOR, value='a.DOCUMENT_MANAGEMENT')
-            time.sleep(2)
+            self._sleep(2)
 
         # iframe switch before clicking CNEE BECODE, check ID or Classname
-        try_attempt_count: int = 0
-        while True:
-            try:
-                if try_attempt_count > 20:
-                    raise Exception('Look like we have problems with the web structure changed - '
-                                    'we could not click on the option_booking ! Need to our investigation')
-                iframe = self._driver.find_element(by=By.ID, value='applicationIframe')
-                self._driver.switch_to.frame(iframe)
-                logger.info('get iframe by id successfully')
-                break
-
-            except Exception as exception:
-                # try to get iframe - demacia web :)
-                logger.error(str(exception))
-                while True:
-                    self._driver.get('https://portal.damco.com/Applications/documentmanagement/')
-                    current_url: str = self._driver.current_url
-                    if current_url.endswith('documentmanagement/'):
-                        break
-                    self._click_when_element_present(by=By.CSS_SELECTOR, value='a.DOCUMENT_MANAGEMENT')
-                    time.sleep(2)
-
-                self._click_when_element_present(by=By.ID, value='applicationIframe')
-                time.sleep(1)
-                logger.info("trying to get iframe")
-                try_attempt_count += 1
-                continue
+        def switch_to_application_iframe() -> None:
+            iframe = self._driver.find_element(by=By.ID, value='applicationIframe')
+            self._driver.switch_to.frame(iframe)
+            logger.info('get iframe by id successfully')
+
+        def reload_application_iframe(attempt: int, exception: Exception) -> None:
+            # try to get iframe - demacia web :)
+            logger.error(str(exception))
+            while True:
+                self._navigate_to('https://portal.damco.com/Applications/documentmanagement/')
+                current_url: str = self._driver.current_url
+                if current_url.endswith('documentmanagement/'):
+                    break
+                self._click_when_element_present(by=By.CSS_SELECTOR, value='a.DOCUMENT_MANAGEMENT')
+                self._sleep(2)
+
+            self._click_when_element_present(by=By.ID, value='applicationIframe')
+            logger.info("trying to get iframe")
+
+        self._create_retry_policy(max_attempts=21, max_delay=4.0).execute(
+            switch_to_application_iframe,
+            on_retry=reload_application_iframe,
+            description='Getting the application iframe')
 
         # get cneebecode
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
+        becodes: list[str] = self._get_input_column('excel.column.becode')
+        so_numbers: list[str] = self._get_input_column('excel.column.so')
         becode_to_sonumber: dict[str, str] = {}
 
         if not len(becodes) == len(so_numbers):
@@ -110,7 +102,7 @@ class Release(WebTask):
 
         logger.info("Complete Upload")
 
-        self._driver.close()
+        self._close_browser()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -156,7 +148,7 @@ class Release(WebTask):
         logger.info('Go to next page successfully')
 
         self._click_when_element_present(by=By.CSS_SELECTOR, value='#template #row0 td:nth-child(2) input',
-                                         time_sleep=2)
+                                         settle_time=2)
         logger.info('clicked CBL box')
 
         self._click_when_element_present(by=By.CSS_SELECTOR, value='#moreOptionSo button')
@@ -172,18 +164,18 @@ class Release(WebTask):
         while number_of_tabs < 2:
             if try_count > 10:
                 raise Exception('Can not invoke a new tab')
-            time.sleep(1)
-        self._driver.switch_to.window(self._driver.window_handles[-1])
-        time.sleep(2)
+            self._sleep(1)
+        self._switch_to_window(self._driver.window_handles[-1])
+        self._sleep(2)
         logger.info('switched to tab2')
 
         # switched tab 2
         self._click_when_element_present(by=By.NAME, value='search2')
         self._click_when_element_present(by=By.NAME, value='ok')
         logger.info('releasing in tab2 - going to switch to tab1')
-        time.sleep(1)
+        self._sleep(1)
 
-        self._driver.switch_to.window(self._driver.window_handles[-1])
+        self._switch_to_window(self._driver.window_handles[-1])
         iframe = self._driver.find_element(by=By.ID, value='applicationIframe')
         self._driver.switch_to.frame(iframe)
         logger.info('re-switched to 1st tab')
@@ -1,5 +1,4 @@
 import os
-import time
 from logging import Logger
 from typing import Callable
 
@@ -8,7 +7,6 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
 from src.common.ResourceLock import ResourceLock
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.WebTask import WebTask
@@ -25,14 +23,17 @@ class Upload_bill_fcr_only(WebTask):
                                      'excel.column.so', 'excel.column.becode']
         return mandatory_keys
 
+    def _input_column_settings(self) -> list[str]:
+        return ['excel.column.becode', 'excel.column.so']
+
     def automate(self):
         logger: Logger = get_current_logger()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("Start processing")
-        self._driver.get('https://portal.damco.com/Applications/documentmanagement/')
         logger.info('Try to login')
-        self.__login()
+        self._log_in(site_url='https://portal.damco.com/Applications/documentmanagement/',
+                     by=By.ID, login_form_selector='ctl00_ContentPlaceHolder1_UsernameTextBox', login=self.__login)
         logger.info("Login successfully")
         logger.info("Navigate to refresh page the first time")
 
@@ -41,45 +42,36 @@ class Upload_bill_fcr_only(WebTask):
             if current_url.endswith('documentmanagement/'):
                 break
             self._click_when_element_present(by=By.CSS_SELECTOR, value='a.DOCUMENT_MANAGEMENT')
-            time.sleep(2)
+            self._sleep(2)
 
         # iframe switch before clicking CNEE BECODE, check ID or Classname
-        try_attempt_count: int = 0
-        while True:
-            try:
-                if try_attempt_count > 20:
-                    raise Exception('Look like we have problems with the web structure changed - '
-                                    'we could not click on the option_booking ! Need to our investigation')
-                iframe = self._driver.find_element(by=By.ID, value='applicationIframe')
-                self._driver.switch_to.frame(iframe)
-                logger.info('get iframe by id successfully')
-                break
-
-            except Exception as exception:
-                # try to get iframe - demacia web :)
-                logger.error(str(exception))
-                while True:
-                    self._driver.get('https://portal.damco.com/Applications/documentmanagement/')
-                    current_url: str = self._driver.current_url
-                    if current_url.endswith('documentmanagement/'):
-                        break
-                    self._click_when_element_present(by=By.CSS_SELECTOR, value='a.DOCUMENT_MANAGEMENT')
-                    time.sleep(2)
-
-                self._click_when_element_present(by=By.ID, value='applicationIframe')
-                time.sleep(1)
-                logger.info("trying to get iframe")
-                try_attempt_count += 1
-                continue
+        def switch_to_application_iframe() -> None:
+            iframe = self._driver.find_element(by=By.ID, value='applicationIframe')
+            self._driver.switch_to.frame(iframe)
+            logger.info('get iframe by id successfully')
+
+        def reload_application_iframe(attempt: int, exception: Exception) -> None:
+            # try to get iframe - demacia web :)
+            logger.error(str(exception))
+            while True:
+                self._navigate_to('https://portal.damco.com/Applications/documentmanagement/')
+                current_url: str = self._driver.current_url
+                if current_url.endswith('documentmanagement/'):
+                    break
+                self._click_when_element_present(by=By.CSS_SELECTOR, value='a.DOCUMENT_MANAGEMENT')
+                self._sleep(2)
+
+            self._click_when_element_present(by=By.ID, value='applicationIframe')
+            logger.info("trying to get iframe")
+
+        self._create_retry_policy(max_attempts=21, max_delay=4.0).execute(
+            switch_to_application_iframe,
+            on_retry=reload_application_iframe,
+            description='Getting the application iframe')
 
         # get cneebecode
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
+        becodes: list[str] = self._get_input_column('excel.column.becode')
+        so_numbers: list[str] = self._get_input_column('excel.column.so')
         becode_to_sonumber: dict[str, str] = {}
 
         if not len(so_numbers) == len(becodes):
@@ -108,7 +100,7 @@ class Upload_bill_fcr_only(WebTask):
 
         logger.info("Complete Upload")
 
-        self._driver.close()
+        self._close_browser()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -172,9 +164,9 @@ class Upload_bill_fcr_only(WebTask):
         while number_of_tabs < 2:
             if try_count > 10:
                 raise Exception('Can not invoke a new tab')
-            time.sleep(1)
-        self._driver.switch_to.window(self._driver.window_handles[-1])
-        time.sleep(2)
+            self._sleep(1)
+        self._switch_to_window(self._driver.window_handles[-1])
+        self._sleep(2)
         logger.info('switched to new tab')
 
         # switched tab 2
@@ -240,29 +232,29 @@ class Upload_bill_fcr_only(WebTask):
         logger.info('Confirmed upload')
 
         # switched to tab 3
-        time.sleep(1)
-        self._driver.switch_to.window(self._driver.window_handles[-1])
+        self._sleep(1)
+        self._switch_to_window(self._driver.window_handles[-1])
         logger.info('switched to 3rd tab')
         self._click_when_element_present(by=By.CSS_SELECTOR, value='input.button.upload')
 
         number_of_tabs = len(self._driver.window_handles)
         while number_of_tabs == 3:
-            time.sleep(2)
+            self._sleep(2)
             number_of_tabs = len(self._driver.window_handles)
 
         # re-switch tab2
-        self._driver.switch_to.window(self._driver.window_handles[-1])
+        self._switch_to_window(self._driver.window_handles[-1])
         logger.info('re-switched to 2nd tab')
 
         self._click_when_element_present(by=By.CSS_SELECTOR, value='input.button.upload')
         while number_of_tabs == 2:
-            time.sleep(2)
+            self._sleep(2)
             number_of_tabs = len(self._driver.window_handles)
 
         # re-switch tab1 and re-get iframe
-        time.sleep(1)
+        self._sleep(1)
 
-        self._driver.switch_to.window(self._driver.window_handles[-1])
+        self._switch_to_window(self._driver.window_handles[-1])
         iframe = self._driver.find_element(by=By.ID, value='applicationIframe')
         self._driver.switch_to.frame(iframe)
         logger.info('re-switched to 1st tab')
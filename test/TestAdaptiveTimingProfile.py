@@ -0,0 +1,43 @@
+import os
+import tempfile
+import time
+
+from src.common.AdaptiveTimingProfile import AdaptiveTimingProfile
+from src.task.AutomatedTask import AutomatedTask
+
+
+class WaitingTask(AutomatedTask):
+
+    def mandatory_settings(self) -> list[str]:
+        return []
+
+    def automate(self):
+        pass
+
+
+if __name__ == "__main__":
+    profile_path: str = os.path.join(tempfile.mkdtemp(), 'WaitingTask.json')
+    profile: AdaptiveTimingProfile = AdaptiveTimingProfile(profile_path=profile_path)
+    for _ in range(10):
+        profile.observe('slow portal', 0.01)
+    assert profile.tune_poll_interval('slow portal', 1) == 0.05, "A fast operation must be polled often"
+    assert profile.tune_poll_interval('unknown', 1) == 1, "An operation without samples must keep its default"
+
+    profile.save()
+    assert AdaptiveTimingProfile(profile_path=profile_path).tune_poll_interval('slow portal', 1) == 0.05, \
+        "The samples must be kept between the runs"
+
+    task: WaitingTask = WaitingTask({'invoked_class': 'WaitingTask', 'time.unit.factor': '1'}, None)
+    task._adaptive_timing_profile = profile
+    start_time: float = time.monotonic()
+    assert task._wait_until(condition=lambda: time.monotonic() - start_time >= 2.5,
+                            operation_key='slow portal',
+                            timeout=5), "A slow outlier after fast samples must still be waited for"
+
+    try:
+        task._wait_until(condition=lambda: False, operation_key='slow portal', timeout=0.2)
+        raise AssertionError('TimeoutError is expected')
+    except TimeoutError:
+        pass
+
+    print('AdaptiveTimingProfile works as expected')
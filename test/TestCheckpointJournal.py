@@ -0,0 +1,77 @@
+import os
+import tempfile
+
+from src.common.CheckpointJournal import CheckpointJournal
+from src.task.AutomatedTask import AutomatedTask
+
+
+class PartlyFailingTask(AutomatedTask):
+
+    def mandatory_settings(self) -> list[str]:
+        return []
+
+    def automate(self):
+        pass
+
+
+if __name__ == "__main__":
+    journal_path: str = os.path.join(tempfile.mkdtemp(), 'Task.jsonl')
+    fingerprint: str = CheckpointJournal.compute_fingerprint('input.xlsx', ['A1', 'A2', 'A3'])
+    assert fingerprint == CheckpointJournal.compute_fingerprint('input.xlsx', ['A1', 'A2', 'A3'])
+    assert fingerprint != CheckpointJournal.compute_fingerprint('input.xlsx', ['A1', 'A2']), \
+        "Another list of elements must give another fingerprint"
+    assert fingerprint != CheckpointJournal.compute_fingerprint('other.xlsx', ['A1', 'A2', 'A3']), \
+        "Another input must give another fingerprint"
+
+    journal: CheckpointJournal = CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint)
+    journal.mark_done('A1')
+    journal.mark_done('A2')
+    journal.mark_done('A2')
+    assert journal.done_count == 2
+
+    resumed_journal: CheckpointJournal = CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint)
+    assert resumed_journal.is_done('A1') and resumed_journal.is_done('A2') and not resumed_journal.is_done('A3'), \
+        "A re-run on the same input must resume the done elements"
+
+    other_fingerprint: str = CheckpointJournal.compute_fingerprint('input.xlsx', ['B1'])
+    assert CheckpointJournal(journal_path=journal_path, fingerprint=other_fingerprint).done_count == 0, \
+        "A changed input must start from scratch"
+
+    # a crash in the middle of writing leaves a cut last line behind
+    with open(journal_path, 'a') as journal_file:
+        journal_file.write('{"fingerprint": "' + fingerprint[:10])
+    assert CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint).done_count == 2, \
+        "A broken line must be skipped without losing the records before it"
+    with open(journal_path, 'a') as journal_file:
+        journal_file.write('\n')
+
+    resumed_journal.reset()
+    assert resumed_journal.done_count == 0
+    assert CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint).done_count == 0, \
+        "A reset must discard the earlier records of the fingerprint"
+
+    resumed_journal.mark_done('A3')
+    reopened_journal: CheckpointJournal = CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint)
+    assert reopened_journal.is_done('A3') and not reopened_journal.is_done('A1'), \
+        "The records after a reset must be kept"
+
+    with open(journal_path, 'r') as journal_file:
+        assert len(journal_file.readlines()) == 1, "A reset must compact the journal"
+
+    with open(journal_path, 'a') as journal_file:
+        journal_file.write('{"fingerprint": "' + fingerprint + '", "key": "A3", "status": "done"}\n')
+        journal_file.write('{"fingerprint": "' + fingerprint + '", "status": "reset"}\n')
+    assert CheckpointJournal(journal_path=journal_path, fingerprint=fingerprint).done_count == 0
+    with open(journal_path, 'r') as journal_file:
+        assert len(journal_file.readlines()) == 0, "A load must compact the records discarded by a reset"
+
+    task_journal_path: str = os.path.join(tempfile.mkdtemp(), 'PartlyFailingTask.jsonl')
+    task: PartlyFailingTask = PartlyFailingTask({'invoked_class': 'PartlyFailingTask'}, None)
+    task._checkpoint_journal = CheckpointJournal(journal_path=task_journal_path, fingerprint=fingerprint)
+    task._AutomatedTask__checkpoint_element_keys = ['A1', 'A2', 'A3']
+    task._checkpoint_element('A1')
+    task._AutomatedTask__complete_checkpoint_journal()
+    assert CheckpointJournal(journal_path=task_journal_path, fingerprint=fingerprint).is_done('A1'), \
+        "A run which did not process every element must keep its checkpoint"
+
+    print('CheckpointJournal works as expected')
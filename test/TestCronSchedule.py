@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from src.common.CronSchedule import CronSchedule
+
+if __name__ == "__main__":
+    # 2024-01-07 is a Sunday
+    now: datetime = datetime(2024, 1, 7, 10, 17, 42)
+
+    assert CronSchedule('0 * * * *').next_fire_time(now) == datetime(2024, 1, 7, 11, 0)
+    assert CronSchedule('*/15 * * * *').next_fire_time(now) == datetime(2024, 1, 7, 10, 30)
+    assert CronSchedule('30 8 * * 1-5').next_fire_time(now) == datetime(2024, 1, 8, 8, 30)
+    assert CronSchedule('0 0 1 * *').next_fire_time(now) == datetime(2024, 2, 1, 0, 0)
+    assert CronSchedule('0 0 29 2 *').next_fire_time(now) == datetime(2024, 2, 29, 0, 0)
+    assert CronSchedule('0 9 13 * 5').next_fire_time(now) == datetime(2024, 1, 12, 9, 0), \
+        "A restricted day of month and day of week must fire on either of them"
+
+    try:
+        CronSchedule('0 25 * * *')
+        raise AssertionError('An hour out of range must be rejected')
+    except AssertionError:
+        raise
+    except Exception:
+        pass
+
+    print('CronSchedule works as expected')
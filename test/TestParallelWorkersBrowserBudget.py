@@ -0,0 +1,54 @@
+import os
+import threading
+from types import SimpleNamespace
+
+from src.common.BrowserBudget import BrowserBudget
+from src.task.WebTask import WebTask
+
+
+class FakeDriver:
+
+    def __init__(self):
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=os.getpid()))
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        return {}
+
+    def quit(self) -> None:
+        pass
+
+
+class ParallelTask(WebTask):
+
+    def __init__(self, settings: dict[str, str]):
+        super().__init__(settings, None)
+        self.processed_elements: list[int] = []
+        self.processed_elements_lock: threading.Lock = threading.Lock()
+
+    def mandatory_settings(self) -> list[str]:
+        return []
+
+    def automate(self):
+        self.perform_mainloop_on_collection(list(range(12)), self.process)
+
+    def process(self, element: int) -> None:
+        self._sleep(0.05)
+        with self.processed_elements_lock:
+            self.processed_elements.append(element)
+
+
+if __name__ == "__main__":
+    # the browsers are not started, the budget is what is tested
+    WebTask._WebTask__start_driver = lambda self: FakeDriver()
+    BrowserBudget.get_instance().configure(max_browsers=2)
+
+    task: ParallelTask = ParallelTask({'invoked_class': 'ParallelTask', 'parallel.workers': '4'})
+    task_thread: threading.Thread = threading.Thread(target=task.perform, daemon=True)
+    task_thread.start()
+    task_thread.join(timeout=60)
+
+    assert not task_thread.is_alive(), "More workers than browser.max_concurrent must not wait for each other forever"
+    assert sorted(task.processed_elements) == list(range(12)), "The workers allowed by the budget must do all the work"
+    assert BrowserBudget.get_instance().try_acquire() is not None, "The leases of the workers must be released"
+
+    print('The parallel workers stay within the browser budget as expected')
@@ -0,0 +1,48 @@
+from src.common.CancellationToken import OperationCancelledException
+from src.common.RetryPolicy import RetryPolicy, RetryExhaustedException
+
+if __name__ == "__main__":
+    delays: list[float] = []
+    policy = RetryPolicy(max_attempts=4, initial_delay=1, max_delay=3, jitter=0.5, sleep=delays.append)
+
+    calls: list[int] = []
+
+
+    def fail_twice() -> str:
+        calls.append(len(calls))
+        if len(calls) < 3:
+            raise ValueError('Not ready yet')
+        return 'done'
+
+
+    assert policy.execute(fail_twice) == 'done'
+    assert policy.total_attempts == 3 and policy.total_failures == 2
+    assert 0.5 <= delays[0] <= 1 and 1 <= delays[1] <= 2, "The delays must grow exponentially, shrunk by the jitter"
+
+    try:
+        RetryPolicy(max_attempts=2, sleep=lambda delay: None).execute(lambda: 1 / 0)
+        raise AssertionError('RetryExhaustedException is expected')
+    except RetryExhaustedException as exception:
+        assert isinstance(exception.__cause__, ZeroDivisionError)
+
+    try:
+        RetryPolicy(retryable_exceptions=(ValueError,), sleep=lambda delay: None).execute(lambda: 1 / 0)
+        raise AssertionError('A non retryable exception must be raised immediately')
+    except ZeroDivisionError:
+        pass
+
+    retried_attempts: list[int] = []
+
+
+    def cancel() -> None:
+        raise OperationCancelledException('Terminated')
+
+
+    try:
+        RetryPolicy(sleep=lambda delay: None).execute(cancel, on_retry=lambda attempt, exception:
+                                                      retried_attempts.append(attempt))
+        raise AssertionError('OperationCancelledException is expected')
+    except OperationCancelledException:
+        assert len(retried_attempts) == 0, "A cancellation must not be retried"
+
+    print('RetryPolicy works as expected')
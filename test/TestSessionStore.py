@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+from src.common.SessionStore import SessionStore
+
+if __name__ == "__main__":
+    store_dir: str = os.path.join(tempfile.mkdtemp(), 'session')
+    key_path: str = os.path.join(tempfile.mkdtemp(), 'key', SessionStore.KEY_FILE_NAME)
+    store: SessionStore = SessionStore(store_dir, key_path)
+    state: dict = {'cookies': [{'name': 'ASP.NET_SessionId', 'value': 'abc', 'domain': 'portal.damco.com'}],
+                   'origin': 'https://portal.damco.com',
+                   'local_storage': {}}
+
+    assert store.load('portal.damco.com', 'user') is None
+    store.save('portal.damco.com', 'user', state)
+    assert SessionStore(store_dir, key_path).load('portal.damco.com', 'user')['cookies'] == state['cookies'], \
+        "A saved session must be restored by another store sharing the key"
+    assert store.load('portal.damco.com', 'other user') is None
+
+    for file_name in os.listdir(store_dir):
+        with open(os.path.join(store_dir, file_name), 'rb') as stored_file:
+            assert b'ASP.NET_SessionId' not in stored_file.read(), "A session must not be stored in clear"
+
+    assert not os.path.exists(os.path.join(store_dir, SessionStore.KEY_FILE_NAME)), \
+        "The key must not be stored along with the sessions"
+    if os.name == 'posix':
+        assert os.stat(key_path).st_mode & 0o777 == 0o600, "The key must only be readable by its owner"
+
+    os.remove(key_path)
+    assert SessionStore(store_dir, key_path).load('portal.damco.com', 'user') is None, \
+        "A session encrypted with a lost key must be discarded"
+
+    print('SessionStore works as expected')
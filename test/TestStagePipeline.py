@@ -0,0 +1,55 @@
+import threading
+
+from src.common.StagePipeline import PipelineStage, StagePipeline
+
+if __name__ == "__main__":
+    completed_elements: list[int] = []
+    saved_results: list[str] = []
+    saving_threads: set[str] = set()
+
+
+    def download(element: int) -> str:
+        return 'document {}'.format(element)
+
+
+    def extract(document: str) -> str:
+        if document == 'document 3':
+            raise ValueError('Broken document')
+        return document.upper()
+
+
+    def save(text: str) -> None:
+        saving_threads.add(threading.current_thread().name)
+        saved_results.append(text)
+
+
+    pipeline: StagePipeline = StagePipeline(stages=[PipelineStage('download', download),
+                                                    PipelineStage('extract', extract),
+                                                    PipelineStage('save', save)],
+                                            queue_size=1,
+                                            on_element_completed=completed_elements.append)
+    pipeline.start()
+    for each_element in range(1, 6):
+        pipeline.submit(each_element)
+    pipeline.close()
+
+    assert saved_results == ['DOCUMENT 1', 'DOCUMENT 2', 'DOCUMENT 4', 'DOCUMENT 5'], \
+        "Each stage must receive the result of the previous one, in order"
+    assert completed_elements == [1, 2, 4, 5], "An element failing in a later stage must not be completed"
+    assert threading.current_thread().name not in saving_threads, "A later stage must run on its own thread"
+
+    statistics = pipeline.get_statistics()
+    assert [each.processed_count for each in statistics] == [5, 4, 4]
+    assert [each.failed_count for each in statistics] == [0, 1, 0]
+
+    first_stage_pipeline: StagePipeline = StagePipeline(stages=[PipelineStage('download', lambda element: 1 / 0)])
+    first_stage_pipeline.start()
+    try:
+        first_stage_pipeline.submit(1)
+        raise AssertionError('A failure of the first stage must be raised to the submitter')
+    except ZeroDivisionError:
+        pass
+    finally:
+        first_stage_pipeline.close()
+
+    print('StagePipeline works as expected')
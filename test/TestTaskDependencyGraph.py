@@ -0,0 +1,16 @@
+from src.console.TaskDependencyGraph import parse_task_dependencies, sort_tasks_topologically
+
+if __name__ == "__main__":
+    task_names: list[str] = ['Upload', 'Duty', 'Download_CottonOn']
+    dependencies: dict[str, set[str]] = parse_task_dependencies({'invoked_classes': ', '.join(task_names),
+                                                                 'Upload.after': 'Download_CottonOn'}, task_names)
+    assert dependencies == {'Upload': {'Download_CottonOn'}, 'Duty': set(), 'Download_CottonOn': set()}
+    assert sort_tasks_topologically(task_names, dependencies) == ['Download_CottonOn', 'Upload', 'Duty']
+
+    try:
+        sort_tasks_topologically(['A', 'B'], {'A': {'B'}, 'B': {'A'}})
+        raise AssertionError('The circular dependencies must be rejected')
+    except Exception as exception:
+        assert 'contain a cycle' in str(exception)
+
+    print('TaskDependencyGraph works as expected')
@@ -0,0 +1,43 @@
+import time
+
+from src.common.CancellationToken import CancellationToken, OperationCancelledException
+from src.common.HostRateLimiter import TokenBucket, HostRateLimiter
+
+if __name__ == "__main__":
+    bucket: TokenBucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0], "A full bucket must let the burst through"
+    waiting_time: float = bucket.try_acquire()
+    assert 0 < waiting_time <= 0.1, "An empty bucket must tell the time until its next token"
+
+    start_time: float = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - start_time >= 0.15, "An empty bucket must pace the requests at its rate"
+
+    cancellation_token: CancellationToken = CancellationToken()
+    cancellation_token.cancel()
+    try:
+        bucket_to_cancel: TokenBucket = TokenBucket(rate=0.01)
+        bucket_to_cancel.acquire()
+        bucket_to_cancel.acquire(cancellation_token)
+        raise AssertionError('OperationCancelledException is expected')
+    except OperationCancelledException:
+        pass
+
+    try:
+        TokenBucket(rate=0)
+        raise AssertionError('A bucket without rate must be refused')
+    except ValueError:
+        pass
+
+    rate_limiter: HostRateLimiter = HostRateLimiter.get_instance()
+    rate_limiter.configure_from_settings({'rate.limit.Portal.Example.com': '5, 2', 'excel.path': 'input.xlsx'})
+    rate_limiter.configure('portal.example.com', rate=20)
+    assert rate_limiter.has_limits
+    start_time = time.monotonic()
+    for _ in range(3):
+        rate_limiter.acquire('https://portal.example.com/documents/1.pdf')
+    assert time.monotonic() - start_time >= 0.15, "A host must keep its strictest rate"
+    assert rate_limiter.acquire('https://other.example.com/') == 0, "A host without rate must not be limited"
+
+    print('TokenBucket works as expected')